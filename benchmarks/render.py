@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+"""render: times rendering of every cairoplot plot type.
+
+Usage: render.py [options]
+
+Each plot type is rendered at several data sizes to an in-memory
+surface, each in its own process so peak memory is measured alone.
+For every case the time to load the data (the plot's constructor) and
+to render it (best of --repeat runs), the peak memory of the process
+and the number of calls to the cairo context are recorded.
+
+Results are written as JSON (to --output, or printed), and can be
+compared with the results of another revision with --compare.
+"""
+
+import math
+import optparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# run from a checkout: cairoplot and plotter are in the parent directory
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import cairo
+import cairoplot
+from plotter import json
+
+_WIDTH = 640
+_HEIGHT = 480
+
+_SIZES = [10, 100, 1000]
+
+# surfaces to render to
+_BACKENDS = ["image", "svg"]
+
+
+class CountingContext(object):
+    """Cairo context that counts calls to each of its methods."""
+
+    def __init__(self, context, counts):
+        """Wraps context, adding calls to the dictionary counts."""
+        self.context = context
+        self.counts = counts
+
+
+    def __getattr__(self, name):
+        attribute = getattr(self.context, name)
+        if not callable(attribute):
+            return attribute
+        counts = self.counts
+
+        def call(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return attribute(*args, **kwargs)
+        return call
+
+
+class CountingHandler(cairoplot.handlers.VectorHandler):
+    """Handler giving plots a CountingContext."""
+
+    def __init__(self, surface, width, height):
+        """Creates handler for surface, counting calls in self.counts."""
+        cairoplot.handlers.VectorHandler.__init__(self, surface, width,
+                height)
+        self.counts = {}
+
+
+    def prepare(self, plot):
+        cairoplot.handlers.VectorHandler.prepare(self, plot)
+        plot.context = CountingContext(plot.context, self.counts)
+
+
+def _surface(backend):
+    """Returns a new in-memory surface for backend."""
+    if backend == "svg":
+        return cairo.SVGSurface(None, _WIDTH, _HEIGHT)
+    return cairo.ImageSurface(cairo.FORMAT_ARGB32, _WIDTH, _HEIGHT)
+
+
+def _values(size):
+    """Returns size positive values (the same for every run)."""
+    generator = random.Random(size)
+    return [generator.uniform(1, 100) for i in xrange(size)]
+
+
+def _scatter(handler, size):
+    values = _values(size)
+    return cairoplot.ScatterPlot(handler, [(i, v) for i, v in enumerate(values)],
+            width=_WIDTH, height=_HEIGHT, axis=True, grid=True, dots=2)
+
+def _dot_line(handler, size):
+    return cairoplot.DotLinePlot(handler, _values(size), _WIDTH, _HEIGHT,
+            axis=True, grid=True)
+
+def _function(handler, size):
+    return cairoplot.FunctionPlot(handler, math.sin, _WIDTH, _HEIGHT,
+            grid=True, x_bounds=(0, 10), step=10.0 / size)
+
+def _vertical_bar(handler, size):
+    return cairoplot.VerticalBarPlot(handler, _values(size), _WIDTH, _HEIGHT,
+            grid=True)
+
+def _horizontal_bar(handler, size):
+    return cairoplot.HorizontalBarPlot(handler, _values(size), _WIDTH,
+            _HEIGHT, grid=True)
+
+def _stream(handler, size):
+    values = _values(size)
+    return cairoplot.StreamChart(handler, [values[i:i + 3]
+            for i in xrange(0, size - 2, 3)], _WIDTH, _HEIGHT, grid=True)
+
+def _pie(handler, size):
+    return cairoplot.PiePlot(handler, dict(("slice %d" % i, v)
+            for i, v in enumerate(_values(size))), _WIDTH, _HEIGHT)
+
+def _donut(handler, size):
+    return cairoplot.DonutPlot(handler, dict(("slice %d" % i, v)
+            for i, v in enumerate(_values(size))), _WIDTH, _HEIGHT)
+
+def _gantt(handler, size):
+    pieces = [(i % 10, i % 10 + 1) for i in xrange(size)]
+    x_labels = ["task %d" % i for i in xrange(size)]
+    y_labels = ["%d" % i for i in xrange(11)]
+    colors = [(0.2, 0.4, 0.8)] * size
+    return cairoplot.GanttChart(handler, pieces, _WIDTH, _HEIGHT, x_labels,
+            y_labels, colors)
+
+# plot type: function creating the plot with handler, for size values
+_CASES = {
+    "ScatterPlot": _scatter,
+    "DotLinePlot": _dot_line,
+    "FunctionPlot": _function,
+    "VerticalBarPlot": _vertical_bar,
+    "HorizontalBarPlot": _horizontal_bar,
+    "StreamChart": _stream,
+    "PiePlot": _pie,
+    "DonutPlot": _donut,
+    "GanttChart": _gantt,
+}
+
+
+def run_case(plot, size, backend, repeat):
+    """Returns result (a dictionary) of benchmarking one case here."""
+
+    create = _CASES[plot]
+    load = render = None
+    for i in xrange(repeat):
+        handler = cairoplot.handlers.VectorHandler(_surface(backend),
+                _WIDTH, _HEIGHT)
+        start = time.time()
+        instance = create(handler, size)
+        loaded = time.time()
+        instance.render()
+        instance.commit()
+        end = time.time()
+        load = min(load or loaded - start, loaded - start)
+        render = min(render or end - loaded, end - loaded)
+
+    # calls are counted separately, so counting doesn't slow the timing
+    handler = CountingHandler(_surface(backend), _WIDTH, _HEIGHT)
+    instance = create(handler, size)
+    instance.render()
+    instance.commit()
+
+    return {"plot": plot, "size": size, "backend": backend,
+            "load_seconds": load, "render_seconds": render,
+            "peak_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "calls": sum(handler.counts.values()),
+            "call_counts": handler.counts}
+
+
+def run(plots, sizes, backends, repeat):
+    """Returns results of all cases, each run in a new process."""
+
+    results = []
+    for plot in plots:
+        for size in sizes:
+            for backend in backends:
+                command = [sys.executable, os.path.abspath(__file__),
+                        "--case", plot, "--sizes", str(size),
+                        "--backends", backend, "--repeat", str(repeat)]
+                process = subprocess.Popen(command, stdout=subprocess.PIPE)
+                output = process.communicate()[0]
+                if process.returncode != 0:
+                    results.append({"plot": plot, "size": size,
+                            "backend": backend, "error": process.returncode})
+                    continue
+                results.append(json.loads(output))
+    return results
+
+
+def _revision():
+    """Returns the checkout's git revision (or None)."""
+    try:
+        process = subprocess.Popen(["git", "rev-parse", "HEAD"], cwd=_ROOT,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError:
+        return None
+    output = process.communicate()[0].strip()
+    return process.returncode == 0 and output or None
+
+
+def compare(old, new):
+    """Returns lines comparing render times of results old and new."""
+
+    times = {}
+    for result in old["results"]:
+        if "error" not in result:
+            key = (result["plot"], result["size"], result["backend"])
+            times[key] = result["render_seconds"]
+
+    lines = []
+    for result in new["results"]:
+        key = (result["plot"], result["size"], result["backend"])
+        if "error" in result or key not in times or not times[key]:
+            continue
+        lines.append("%-18s %6d %-5s %8.4fs %8.4fs %5.2fx" % (key + (
+                times[key], result["render_seconds"],
+                result["render_seconds"] / times[key])))
+    return lines
+
+
+def main(argv):
+    """Runs benchmarks with command line arguments argv."""
+
+    parser = optparse.OptionParser(usage="%prog [options]")
+    parser.add_option("-p", "--plots", default=",".join(sorted(_CASES)),
+            help="comma separated plot types (default: all)")
+    parser.add_option("-s", "--sizes",
+            default=",".join(str(size) for size in _SIZES),
+            help="comma separated data sizes (default %s)" %
+                    ",".join(str(size) for size in _SIZES))
+    parser.add_option("-b", "--backends", default=",".join(_BACKENDS),
+            help="comma separated surfaces: image, svg (default both)")
+    parser.add_option("-r", "--repeat", type="int", default=3,
+            help="renders of each case, the fastest is kept (default 3)")
+    parser.add_option("-o", "--output", metavar="FILE",
+            help="write results to FILE (default: print them)")
+    parser.add_option("-c", "--compare", metavar="FILE",
+            help="compare render times with results in FILE")
+    parser.add_option("--case", help=optparse.SUPPRESS_HELP)
+    options, args = parser.parse_args(argv[1:])
+
+    sizes = [int(size) for size in options.sizes.split(",")]
+    backends = options.backends.split(",")
+
+    # a single case, in a process of its own
+    if options.case:
+        print json.dumps(run_case(options.case, sizes[0], backends[0],
+                options.repeat))
+        return 0
+
+    plots = options.plots.split(",")
+    for plot in plots:
+        if plot not in _CASES:
+            parser.error("unknown plot type: %s" % plot)
+
+    results = {"revision": _revision(), "python": sys.version.split()[0],
+            "cairo": cairo.version, "time": time.time(),
+            "results": run(plots, sizes, backends, options.repeat)}
+
+    if options.output:
+        output = open(options.output, "w")
+        json.dump(results, output, indent=1)
+        output.close()
+    else:
+        print json.dumps(results, indent=1)
+
+    if options.compare:
+        old = json.load(open(options.compare))
+        for line in compare(old, results):
+            print >> sys.stderr, line
+
+    failed = [result for result in results["results"] if "error" in result]
+    return len(failed) != 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -34,7 +34,10 @@ __version__ = 1.1
 import cairo
 import math
 import random
-from series import Series, Group, Data
+from series import Series, Group, ArrayGroup, Data, is_buffer, is_buffer_columns
+import sampling
+import decimation
+import profiling
 
 import cairoplot.handlers
 
@@ -110,7 +113,11 @@ class Plot(object):
                  x_labels = None,
                  y_labels = None,
                  series_colors = None):
-        random.seed(2)
+        # random colors are the same for every plot, without changing
+        # the global random state (plots may be created in threads)
+        self.random = random.Random(2)
+        # timing of renders (see profiling)
+        self.profile = None
         self.create_surface(surface, width, height)
         self.dimensions = {}
         self.dimensions[HORZ] = width
@@ -200,7 +207,7 @@ class Plot(object):
         #no colors passed
         if not series_colors:
             #Randomize colors
-            self.series_colors = [ [random.random() for i in range(3)] + [1.0, mode]  for series in range( length ) ]
+            self.series_colors = [ [self.random.random() for i in range(3)] + [1.0, mode]  for series in range( length ) ]
         else:
             #Just theme pattern
             if not hasattr( series_colors, "__iter__" ):
@@ -295,12 +302,16 @@ class ScatterPlot( Plot ):
                  x_title  = None,
                  y_title  = None,
                  series_colors = None,
-                 circle_colors = None ):
+                 circle_colors = None,
+                 decimate = False,
+                 capacity = None ):
 
         self.bounds = {}
         self.bounds[HORZ] = x_bounds
         self.bounds[VERT] = y_bounds
         self.bounds[NORM] = z_bounds
+        self.user_bounds = dict(self.bounds)
+        self.user_labels = {HORZ: x_labels, VERT: y_labels}
         self.titles = {}
         self.titles[HORZ] = x_title
         self.titles[VERT] = y_title
@@ -313,6 +324,28 @@ class ScatterPlot( Plot ):
         self.variable_radius = False
         self.x_label_angle = math.pi / 2.5
         self.circle_colors = circle_colors
+        self.decimate = decimate
+
+        # decimated lines of each group, kept with the series and x scale
+        # they were decimated for (see decimate_series)
+        self.decimated = None
+
+        # live plots: most points kept in each group, and the points
+        # added since the last render (None when it must all be rendered)
+        self.capacity = capacity
+        self.new_points = None
+        self.live = False
+
+        # x range shown by live plots (None for the range of their points)
+        self.x_span = None
+
+        # live plots displayed by a GTKHandler draw their data on a layer
+        # of its own (see render_live): how far the x bounds moved since
+        # it was drawn, and how far (in pixels, under one) the data drawn
+        # is from where it should be after scrolling it by whole pixels
+        self.layer = None
+        self.scrolled = 0
+        self.layer_offset = 0
 
         Plot.__init__(self, surface, data, width, height, background, border, x_labels, y_labels, series_colors)
 
@@ -338,6 +371,13 @@ class ScatterPlot( Plot ):
     def load_series(self, data, x_labels = None, y_labels = None, series_colors=None):
         #TODO: In cairoplot 2.0 keep only the Series instances
 
+        # Buffers (one, or coordinate lists) are a single group of points
+        if is_buffer(data) or is_buffer_columns(data):
+            data = ArrayGroup(data)
+        elif hasattr(data, "keys") and max(map(is_buffer, data.values()) +
+                                           map(is_buffer_columns, data.values())):
+            data = Series(data)
+
         # Convert Data and Group to Series
         if isinstance(data, Data) or isinstance(data, Group):
             data = Series(data)
@@ -345,6 +385,10 @@ class ScatterPlot( Plot ):
         # Series
         if  isinstance(data, Series):
             for group in data:
+                if isinstance(group, ArrayGroup):
+                    if len(group.columns) == 3:
+                        self.variable_radius = True
+                    continue
                 for item in group:
                     if len(item) is 3:
                         self.variable_radius = True
@@ -417,26 +461,21 @@ class ScatterPlot( Plot ):
 
     def calc_boundaries(self):
         #HORZ = 0, VERT = 1, NORM = 2
-        min_data_value = [0,0,0]
-        max_data_value = [0,0,0]
-
-        for group in self.series:
-            if type(group[0].content) in (int, float, long):
-                group = [Data((index, item.content)) for index,item in enumerate(group)]
-
-            for point in group:
-                for index, item in enumerate(point.content):
-                    if item > max_data_value[index]:
-                        max_data_value[index] = item
-                    elif item < min_data_value[index]:
-                        min_data_value[index] = item
-
-        if not self.bounds[HORZ]:
-            self.bounds[HORZ] = (min_data_value[HORZ], max_data_value[HORZ])
-        if not self.bounds[VERT]:
-            self.bounds[VERT] = (min_data_value[VERT], max_data_value[VERT])
-        if not self.bounds[NORM]:
-            self.bounds[NORM] = (min_data_value[NORM], max_data_value[NORM])
+        # the series keeps its bounds until it changes (see Series.get_bounds)
+        data_bounds = self.series.get_bounds()
+
+        for direction in (HORZ, VERT, NORM):
+            if not self.bounds[direction]:
+                min_data_value, max_data_value = data_bounds[direction] or (0, 0)
+                if direction == HORZ and self.live:
+                    # live plots show the points they keep, so the x
+                    # range moves with them (see append)
+                    if self.x_span:
+                        min_data_value = max_data_value - self.x_span
+                    self.bounds[direction] = (min_data_value, max_data_value)
+                else:
+                    # bounds always include 0
+                    self.bounds[direction] = (min(min_data_value, 0), max(max_data_value, 0))
 
     def calc_all_extents(self):
         self.calc_extents(HORZ)
@@ -473,11 +512,224 @@ class ScatterPlot( Plot ):
     def get_circle_color(self, value):
         return tuple( [self.circle_colors[0][i] + value*self.circle_color_step[i] for i in range(4)] )
 
-    def render(self):
-        Plot.render(self)
+    def append(self, points, group=0):
+        """Adds points (a point or a list of them) to a group of a live plot.
+
+        group is the index or name of the group. Groups keep at most
+        capacity points, dropping the oldest ones (see ArrayGroup.append),
+        and the bounds and labels that weren't given follow the data: the
+        x bounds are those of the points kept (or x_span up to the last
+        one), not including 0.
+
+        If the y bounds didn't change, and the x bounds didn't either or
+        only moved (the data scrolls, if the plot has a layer), only the
+        new points need to be drawn (see render_live), as long as none
+        of the dropped points were shown. Otherwise the whole plot must
+        be rendered again. The handler is refreshed either way (see
+        Handler.refresh).
+
+        Returns whether the whole plot needs rendering.
+        """
+        if type(points) is not list:
+            points = [points]
+        if type(group) in (str, unicode):
+            group = self.series.get_names().index(group)
+
+        # points are appended to arrays
+        target = self.series[group]
+        if not isinstance(target, ArrayGroup):
+            target = ArrayGroup(target.to_list(), target.name, self.series)
+            self.series.group_list[group] = target
+            self.series.invalidate()
+        target.capacity = self.capacity
+        self.live = True
+
+        # x of the points that will be dropped
+        start = len(target)
+        dropped = 0
+        if self.capacity is not None:
+            dropped = min(start, max(0, start + len(points) - self.capacity))
+        dropped_x = [target[position].content[0] for position in xrange(dropped)]
+
+        removed = 0
+        for point in points:
+            removed += target.append(point)
+        self.decimated = None
+
+        # bounds (and labels) follow the data
+        old_bounds = dict(self.bounds)
+        self.bounds.update(self.user_bounds)
+        self.calc_boundaries()
+        if self.bounds != old_bounds:
+            self.labels.update(self.user_labels)
+            self.calc_labels()
+
+        old, new = old_bounds[HORZ], self.bounds[HORZ]
+        if (self.new_points is None or removed > start or
+            self.bounds[VERT] != old_bounds[VERT] or
+            self.bounds[NORM] != old_bounds[NORM]):
+            self.new_points = None
+        elif [x for x in dropped_x if new[0] <= x <= new[1]]:
+            # dropped points are still shown
+            self.new_points = None
+        elif new != old:
+            # the data scrolls if only the x range moved
+            span = old[1] - old[0]
+            if self.layer is None or abs(new[1] - new[0] - span) > 1e-9 * span:
+                self.new_points = None
+            else:
+                self.scrolled += new[0] - old[0]
+
+        if self.new_points is not None:
+            # positions move back as points are dropped
+            if group in self.new_points:
+                self.new_points[group] = max(0, self.new_points[group] - removed)
+            self.new_points[group] = min(start - removed, self.new_points.get(group, start))
+
+        self.handler.refresh(self)
+        return self.new_points is None
+
+    def render_new_points(self):
+        """Draws the points added since the last render (see append).
+
+        The rest of the plot must already be on the context, as rendered
+        with the same bounds. Returns the area drawn, as a rectangle
+        (x, y, width, height), or None if there were no points.
+        """
+        cr = self.context
+        cr.save()
+        self.clip_plot()
+        x0 = self.borders[HORZ] - self.bounds[HORZ][0] * self.horizontal_step + self.layer_offset
+        y0 = self.borders[VERT] - self.bounds[VERT][0] * self.vertical_step
+
+        xs = []
+        ys = []
+        margin = 1
+        for number, start in self.new_points.items():
+            group = self.series[number]
+            cr.set_source_rgba(*self.series_colors[number][:4])
+
+            # the line continues from the last point drawn
+            first = max(0, start - 1)
+            points = [data.content for data in group[first:]]
+            path = []
+            for point in points:
+                x = x0 + self.horizontal_step * point[0]
+                y = self.dimensions[VERT] - (y0 + self.vertical_step * point[1])
+                path.append((x, y))
+                if y == y:
+                    xs.append(x)
+                    ys.append(y)
 
+            radius = self.dots
+            if self.dots or self.discrete:
+                for point, (x, y) in zip(points, path)[start - first:]:
+                    if y != y:
+                        continue
+                    if self.variable_radius:
+                        radius = point[2]*self.z_step
+                    margin = max(margin, radius + 1)
+                    cr.new_sub_path()
+                    cr.arc(x, y, radius, 0, 2*math.pi)
+                cr.fill()
+
+            if not self.discrete:
+                cr.set_line_width(self.series_widths[number])
+                margin = max(margin, self.series_widths[number] + 1)
+                connected = False
+                for x, y in path:
+                    if y != y:
+                        connected = False
+                    elif connected:
+                        cr.line_to(x, y)
+                    else:
+                        cr.move_to(x, y)
+                        connected = True
+                cr.stroke()
+
+        cr.restore()
+        self.new_points = {}
+        if not xs:
+            return None
+
+        # only the plot area is drawn
+        left = max(min(xs) - margin, self.borders[HORZ])
+        top = max(min(ys) - margin, self.borders[VERT])
+        right = min(max(xs) + margin, self.borders[HORZ] + self.plot_width)
+        bottom = min(max(ys) + margin, self.borders[VERT] + self.plot_height)
+        if right < left or bottom < top:
+            return None
+        return (left, top, right - left, bottom - top)
+
+    def render_live(self):
+        """Draws the points added since the last render (see append) on
+        the plot's layer, scrolling the data already there by as far as
+        the x bounds moved, and draws the rest of the plot over again.
+
+        Only the new points are drawn, the rest doesn't depend on how
+        many points the plot has. The plot is rendered again if its
+        labels no longer fit in the same borders.
+        """
+        area = (self.borders[HORZ], self.borders[VERT], self.plot_width, self.plot_height)
         self.calc_all_extents()
+        if area != (self.borders[HORZ], self.borders[VERT], self.plot_width, self.plot_height):
+            self.render()
+            return
         self.calc_steps()
+
+        # the data is moved by whole pixels, the rest is made up when
+        # drawing the new points
+        pixels = self.scrolled * self.horizontal_step + self.layer_offset
+        shift = int(round(pixels))
+        self.layer_offset = pixels - shift
+        self.scrolled = 0
+        if shift:
+            target = self.layer.get_target()
+            copy = target.create_similar(cairo.CONTENT_COLOR_ALPHA,
+                                         self.dimensions[HORZ], self.dimensions[VERT])
+            cr = cairo.Context(copy)
+            cr.set_source_surface(target, -shift, 0)
+            cr.paint()
+            cr = self.layer
+            cr.save()
+            cr.set_operator(cairo.OPERATOR_SOURCE)
+            cr.set_source_surface(copy, 0, 0)
+            cr.paint()
+            cr.restore()
+
+        context = self.context
+        self.context = self.layer
+        self.render_new_points()
+        self.context = context
+        self.render_frame()
+        self.render_layer()
+        if self.errors:
+            self.render_errors()
+        if self.series_legend and self.series_labels:
+            self.render_legend()
+
+    def render_layer(self):
+        """Paints the plot's layer (its data) in the plot area."""
+        cr = self.context
+        cr.save()
+        cr.rectangle(self.borders[HORZ], self.borders[VERT], self.plot_width, self.plot_height)
+        cr.clip()
+        cr.set_source_surface(self.layer.get_target(), 0, 0)
+        cr.paint()
+        cr.restore()
+
+    def clip_plot(self):
+        """Clips the context to the plot area. A live plot's layer is not
+        clipped on the right, so the data scrolled in from there is whole.
+        """
+        width = self.plot_width
+        if self.context is self.layer:
+            width = self.dimensions[HORZ] - self.borders[HORZ]
+        self.context.rectangle(self.borders[HORZ], self.borders[VERT], width, self.plot_height)
+        self.context.clip()
+
+    def render_frame(self):
+        """Draws everything but the data: background, axis, grid and labels."""
         self.render_background()
         self.render_bounding_box()
         if self.axis:
@@ -485,12 +737,55 @@ class ScatterPlot( Plot ):
         if self.grid:
             self.render_grid()
         self.render_labels()
-        self.render_plot()
+
+    @profiling.profiled
+    def render(self):
+        Plot.render(self)
+
+        # everything added so far is drawn now
+        self.new_points = {}
+        self.scrolled = 0
+        self.layer_offset = 0
+        self.calc_all_extents()
+        self.calc_steps()
+        if self.decimate:
+            self.decimate_series()
+        self.render_frame()
+        if self.layer is None:
+            self.render_plot()
+        else:
+            context = self.context
+            self.context = self.layer
+            self.layer.save()
+            self.layer.set_operator(cairo.OPERATOR_CLEAR)
+            self.layer.paint()
+            self.layer.restore()
+            self.layer.save()
+            self.render_plot()
+            self.layer.restore()
+            self.context = context
+            self.render_layer()
         if self.errors:
             self.render_errors()
         if self.series_legend and self.series_labels:
             self.render_legend()
 
+    def decimate_series(self):
+        """Returns the points of each group's line, decimated for the
+        plot's x bounds and width (see decimation.decimate).
+
+        They are kept until the series, its data (see append) or the x
+        scale change, so rendering the plot again (like when it's
+        exposed) doesn't decimate it again.
+        """
+        scale = (self.bounds[HORZ][0], self.horizontal_step)
+        if (self.decimated is None or self.decimated[0] is not self.series or
+            self.decimated[1] != scale):
+            lines = [decimation.decimate([data.content for data in group], *scale)
+                     for group in self.series]
+            self.decimated = (self.series, scale, lines)
+        return self.decimated[2]
+
     def render_axis(self):
         #Draws both the axis lines and their titles
         cr = self.context
@@ -660,8 +955,7 @@ class ScatterPlot( Plot ):
 
         cr = self.context
         if self.discrete:
-            cr.rectangle(self.borders[HORZ], self.borders[VERT], self.plot_width, self.plot_height)
-            cr.clip()
+            self.clip_plot()
             x0 = self.borders[HORZ] - self.bounds[HORZ][0]*self.horizontal_step
             y0 = self.borders[VERT] - self.bounds[VERT][0]*self.vertical_step
             radius = self.dots
@@ -677,44 +971,64 @@ class ScatterPlot( Plot ):
                     cr.arc(x, self.dimensions[VERT] - y, radius, 0, 2*math.pi)
                     cr.fill()
         else:
-            cr.rectangle(self.borders[HORZ], self.borders[VERT], self.plot_width, self.plot_height)
-            cr.clip()
+            self.clip_plot()
             x0 = self.borders[HORZ] - self.bounds[HORZ][0] * self.horizontal_step
             y0 = self.borders[VERT] - self.bounds[VERT][0] * self.vertical_step
 
             radius = self.dots
             for number, group in  enumerate (self.series):
-                last_data = None
                 cr.set_source_rgba(*self.series_colors[number][:4])
-                for data in group :
-                    x = x0 + self.horizontal_step * data.content[0]
-                    y = y0 + self.vertical_step * data.content[1]
+
+                # lines with more points than pixels can be decimated
+                # (dots are still drawn for every point)
+                points = None
+                if self.dots or not self.decimate:
+                    points = [data.content for data in group]
+                linepoints = points
+                if self.decimate:
+                    linepoints = self.decimate_series()[number]
+
+                # all dots are filled at once (before the line, so they
+                # don't become part of its path)
+                if self.dots:
+                    for point in points :
+                        x = x0 + self.horizontal_step * point[0]
+                        y = y0 + self.vertical_step * point[1]
+                        if y != y: # math.isnan only in 2.6+
+                            continue
+                        if self.variable_radius:
+                            radius = point[2]*self.z_step
+                        cr.new_sub_path()
+                        cr.arc(x, self.dimensions[VERT] - y, radius, 0, 2*math.pi)
+                    cr.fill()
+
+                # the line is a single path, only broken at invalid points,
+                # and stroked once
+                cr.set_line_width(self.series_widths[number])
+
+                # Display line as dash line
+                if self.dash and self.dash[number]:
+                    s = self.series_widths[number]
+                    cr.set_dash([s*3, s*3], 0)
+
+                connected = False
+                for point in linepoints :
+                    x = x0 + self.horizontal_step * point[0]
+                    y = y0 + self.vertical_step * point[1]
 
                     # only draw a line for valid points
                     if y != y: # math.isnan only in 2.6+
-                        last_data = None
+                        connected = False
                         continue
 
-                    if self.dots:
-                        if self.variable_radius:
-                            radius = data.content[2]*self.z_step
-                        cr.arc(x, self.dimensions[VERT] - y, radius, 0, 2*math.pi)
-                        cr.fill()
-                    if last_data:
-                        old_x = x0 + self.horizontal_step * last_data.content[0]
-                        old_y = y0 + self.vertical_step * last_data.content[1]
-                        cr.move_to( old_x, self.dimensions[VERT] - old_y )
+                    if connected:
                         cr.line_to( x, self.dimensions[VERT] - y)
-                        cr.set_line_width(self.series_widths[number])
-
-                        # Display line as dash line
-                        if self.dash and self.dash[number]:
-                            s = self.series_widths[number]
-                            cr.set_dash([s*3, s*3], 0)
+                    else:
+                        cr.move_to( x, self.dimensions[VERT] - y)
+                        connected = True
 
-                        cr.stroke()
-                        cr.set_dash([])
-                    last_data = data
+                cr.stroke()
+                cr.set_dash([])
 
 
 
@@ -737,16 +1051,48 @@ class DotLinePlot(ScatterPlot):
                  y_bounds = None,
                  x_title  = None,
                  y_title  = None,
-                 series_colors = None):
+                 series_colors = None,
+                 decimate = False,
+                 capacity = None):
 
         ScatterPlot.__init__(self, surface, data, None, None, width, height, background, border,
                              axis, dash, False, dots, grid, series_legend, x_labels, y_labels,
-                             x_bounds, y_bounds, None, x_title, y_title, series_colors, None )
+                             x_bounds, y_bounds, None, x_title, y_title, series_colors, None,
+                             decimate, capacity )
 
+        # live plots show the last capacity numbers
+        if capacity:
+            self.x_span = capacity - 1
+
+    def append(self, points, group=0):
+        """Adds points to a group of a live plot (see ScatterPlot.append).
+
+        Numbers are placed after the group's last point, one apart.
+        """
+        if type(points) is not list:
+            points = [points]
+        if type(group) in (str, unicode):
+            group = self.series.get_names().index(group)
+
+        x = 0
+        if len(self.series[group]) > 0:
+            x = self.series[group][-1].content[0] + 1
+        values = []
+        for point in points:
+            if type(point) in (int, float, long):
+                point = (x, point)
+            values.append(point)
+            x = point[0] + 1
+        return ScatterPlot.append(self, values, group)
 
     def load_series(self, data, x_labels = None, y_labels = None, series_colors=None):
         Plot.load_series(self, data, x_labels, y_labels, series_colors)
         for group in self.series :
+            if isinstance(group, ArrayGroup):
+                # groups of points (like from loaders) keep their x
+                if len(group.columns) == 1:
+                    group.add_index()
+                continue
             for index,data in enumerate(group):
                 group[index].content = (index, data.content)
 
@@ -773,7 +1119,15 @@ class FunctionPlot(ScatterPlot):
                  x_title  = None,
                  y_title  = None,
                  series_colors = None,
-                 step = 1):
+                 step = 1,
+                 adaptive = False,
+                 max_points = 1000,
+                 resolution = None,
+                 sample_cache = None,
+                 decimate = False,
+                 budget = None,
+                 record_stats = False,
+                 follow_width = True):
 
         self.function = data
 
@@ -783,18 +1137,77 @@ class FunctionPlot(ScatterPlot):
             self.step = 1
 
         self.discrete = discrete
+        self.adaptive = adaptive
+        self.max_points = max_points
+        self.sample_cache = sample_cache
+        self.budget = budget
+
+        # cost of evaluating each function (see sampling.EvaluationStats),
+        #  only recorded if asked for
+        self.record_stats = record_stats
+        self.evaluation_stats = []
+
+        # with a resolution, the step (or adaptive budget) follows the
+        # width of the output, so sample for the requested width for now
+        # and resample at render time if the handler's width differs
+        # (unless follow_width is off: the samples are drawn scaled, and
+        # the owner of the plot samples again, like CairoPlotCanvas)
+        self.resolution = resolution
+        self.follow_width = follow_width
+        self.sampled_width = None
+        self.user_y_bounds = y_bounds
+        self.user_y_labels = y_labels
+        if self.resolution:
+            self.set_sampled_width(width - 2 * border, x_bounds or (0, 10))
 
         data, x_bounds = self.load_series_from_function( self.function, x_bounds )
 
         ScatterPlot.__init__(self, surface, data, None, None, width, height, background, border,
                              axis, False, discrete, dots, grid, series_legend, x_labels, y_labels,
-                             x_bounds, y_bounds, None, x_title, y_title, series_colors, None )
+                             x_bounds, y_bounds, None, x_title, y_title, series_colors, None,
+                             decimate )
+
+    def set_sampled_width(self, width, x_bounds):
+        """Sets step and max_points to sample resolution points per pixel."""
+        points = max(2, int(width * self.resolution))
+        self.step = float(x_bounds[1] - x_bounds[0]) / (points - 1)
+        if self.step <= 0:
+            self.step = 1
+        self.max_points = points
+        self.sampled_width = width
+
+    def resample(self, width):
+        """Samples functions again for a plot width pixels wide."""
+        self.set_sampled_width(width, self.bounds[HORZ])
+        data, x_bounds = self.load_series_from_function( self.function, self.bounds[HORZ] )
+
+        # forget bounds and labels calculated from the old samples
+        self.bounds[VERT] = self.user_y_bounds
+        self.bounds[NORM] = None
+        self.labels[VERT] = self.user_y_labels
+
+        # keep the same colors for each function
+        series_colors = self.series_colors
+        self.load_series(data)
+        self.series_colors = series_colors
+
+    def calc_all_extents(self):
+        """Resamples if the output's width changed, then measures labels."""
+        width = self.dimensions[HORZ] - 2 * self.border
+        if (self.resolution and self.follow_width and
+            width != self.sampled_width and
+            not isinstance(self.function, (Series, Group, Data))):
+            self.resample(width)
+        ScatterPlot.calc_all_extents(self)
 
     def load_series(self, data, x_labels = None, y_labels = None, series_colors=None):
         Plot.load_series(self, data, x_labels, y_labels, series_colors)
 
         if len(self.series[0][0]) is 1:
             for group_id, group in enumerate(self.series) :
+                if isinstance(group, ArrayGroup):
+                    group.add_index(self.bounds[HORZ][0], self.step)
+                    continue
                 for index,data in enumerate(group):
                     group[index].content = (self.bounds[HORZ][0] + self.step*index, data.content)
 
@@ -806,6 +1219,29 @@ class FunctionPlot(ScatterPlot):
 
         Multiple functions can be defined by a list of functions or
         a dictionary of functions into its corresponding array of data.
+
+        A function with a vectorized attribute is evaluated in one call:
+        vectorized takes a list of x values and returns a list of y values
+        (using nan for points that can't be evaluated).
+
+        If adaptive is set, functions are sampled with at most max_points
+        points placed where the curve bends (see sampling.adaptive),
+        instead of every step. With a resolution, both step and max_points
+        are set from the plot's width instead (see set_sampled_width).
+
+        With a sample_cache (sampling.SampleCache), points are placed on a
+        grid that doesn't move with the bounds, and values from previous
+        plots of the same functions are reused, so moving the bounds only
+        evaluates the newly exposed range.
+
+        With record_stats, the cost of evaluating each function is
+        recorded in evaluation_stats, a list of sampling.EvaluationStats
+        in the same order as the series' groups.
+
+        With a budget (sampling.Budget), each sampling (of all the
+        functions) is limited to its time and evaluations. Points that
+        would go over it are left out (they aren't drawn as undefined),
+        and cut_short is set.
         """
         # TODO: Add the possibility for the user to define multiple functions with different discretization parameters
 
@@ -823,34 +1259,60 @@ class FunctionPlot(ScatterPlot):
         if x_bounds == None:
             x_bounds = (0,10)
 
+        # functions sampled (to clean up the sample cache afterwards)
+        sampled = []
+        self.evaluation_stats = []
+        self.cut_short = False
+        if self.budget is not None:
+            self.budget.start()
+
         # convert a single function into a "group"
         def convert_function(singlefunction, group):
             """Converts function into usable data.
 
             Math bounds errors correspond to nan values."""
 
-            def trygetpoint(inx):
-                """Attempt to evaluate point, returns nan on errors"""
-                try:
-                    return singlefunction(inx)
-                except (ValueError, ZeroDivisionError, OverflowError):
-                    return float("nan")
+            sampled.append(singlefunction)
+            stats = None
+            if self.record_stats:
+                stats = sampling.EvaluationStats(group.name)
+                self.evaluation_stats.append(stats)
+            if self.adaptive:
+                points = sampling.adaptive(singlefunction,
+                        x_bounds[0], x_bounds[1], self.max_points,
+                        cache=self.sample_cache, stats=stats,
+                        budget=self.budget)
+                group.data_list = [[x for x, y in points],
+                                   [y for x, y in points]]
+                return
+
+            if self.sample_cache is not None:
+                points = sampling.anchored(x_bounds[0], x_bounds[1],
+                        sampling.quantize(self.step))
+                values = self.sample_cache.evaluate(singlefunction, points,
+                        stats, self.budget, None)
+            else:
+                points = sampling.uniform(x_bounds[0], x_bounds[1], self.step)
+                values = sampling.evaluate(singlefunction, points, stats,
+                        self.budget, None)
 
-            i = x_bounds[0]
-            while i <= x_bounds[1]:
-                group.add_data(trygetpoint(i))
-                i += self.step
+            # points skipped by the budget are left out
+            if None in values:
+                kept = [(x, y) for x, y in zip(points, values) if y is not None]
+                points = [x for x, y in kept]
+                values = [y for x, y in kept]
+            group.data_list = [points, values]
 
         # TODO: Finish the dict translation
         if hasattr(function, "keys"): #dictionary:
             for key in function.keys():
-                group = Group(name=key)
+                group = ArrayGroup(name=key)
                 convert_function(function[key], group)
                 series.add_group(group)
 
         elif hasattr(function, "__delitem__"): #list of functions
             for f in function:
-                group = Group()
+                group = ArrayGroup()
                 convert_function(f, group)
                 series.add_group(group)
 
@@ -858,10 +1320,19 @@ class FunctionPlot(ScatterPlot):
             series = function
 
         else: # function
-            group = Group()
+            group = ArrayGroup()
             convert_function(function, group)
             series.add_group(group)
 
+        # groups without names are named when added
+        for stats, group in zip(self.evaluation_stats, series.group_list):
+            stats.name = group.name
+
+        if self.sample_cache is not None and sampled:
+            self.sample_cache.keep(sampled, x_bounds[0], x_bounds[1])
+        if self.budget is not None and self.budget.skipped:
+            self.cut_short = True
+
         return series, x_bounds
 
 
@@ -1025,6 +1496,7 @@ class BarPlot(Plot):
         self.steps[other_dir] = float(self.plot_dimensions[other_dir])/(series_length + 0.1*(series_length + 1))
         self.space = 0.1*self.steps[other_dir]
 
+    @profiling.profiled
     def render(self):
         Plot.render(self)
 
@@ -1714,6 +2186,7 @@ class PiePlot(Plot):
         self.context.line_to(self.center[0], self.center[1])
         self.context.close_path()
 
+    @profiling.profiled
     def render(self):
         Plot.render(self)
 
@@ -1868,6 +2341,7 @@ class GanttChart (Plot) :
         self.horizontal_step = (self.dimensions[HORZ] - self.borders[HORZ])/(len(self.labels[VERT]))
         self.vertical_step = self.borders[VERT]
 
+    @profiling.profiled
     def render(self):
         Plot.render(self)
 
@@ -2031,7 +2505,8 @@ def scatter_plot(name,
                  x_title  = None,
                  y_title  = None,
                  series_colors = None,
-                 circle_colors = None):
+                 circle_colors = None,
+                 decimate = False):
 
     """
         - Function to plot scatter data.
@@ -2046,11 +2521,14 @@ def scatter_plot(name,
         series_colors - Define color values for each of the series
         circle_colors - Define a lower and an upper bound for the circle colors for variable radius
                         (3 dimensions) series
+        decimate - Whether or not to draw lines with only a few points per pixel column
+                   (for series with many more points than pixels)
     """
 
     plot = ScatterPlot( name, data, errorx, errory, width, height, background, border,
                         axis, dash, discrete, dots, grid, series_legend, x_labels, y_labels,
-                        x_bounds, y_bounds, z_bounds, x_title, y_title, series_colors, circle_colors )
+                        x_bounds, y_bounds, z_bounds, x_title, y_title, series_colors, circle_colors,
+                        decimate )
     plot.render()
     plot.commit()
 
@@ -2071,7 +2549,8 @@ def dot_line_plot(name,
                   y_bounds = None,
                   x_title  = None,
                   y_title  = None,
-                  series_colors = None):
+                  series_colors = None,
+                  decimate = False):
     """
         - Function to plot graphics using dots and lines.
 
@@ -2093,7 +2572,8 @@ def dot_line_plot(name,
         x_labels, y_labels - lists of strings containing the horizontal and vertical labels for the axis;
         x_bounds, y_bounds - tuples containing the lower and upper value bounds for the data to be plotted;
         x_title - Whether or not to plot a title over the x axis.
-        y_title - Whether or not to plot a title over the y axis.
+        y_title - Whether or not to plot a title over the y axis;
+        decimate - Whether or not to draw lines with only a few points per pixel column.
 
         - Examples of use
 
@@ -2107,7 +2587,7 @@ def dot_line_plot(name,
     """
     plot = DotLinePlot( name, data, width, height, background, border,
                         axis, dash, dots, grid, series_legend, x_labels, y_labels,
-                        x_bounds, y_bounds, x_title, y_title, series_colors )
+                        x_bounds, y_bounds, x_title, y_title, series_colors, decimate )
     plot.render()
     plot.commit()
 
@@ -2129,12 +2609,16 @@ def function_plot(name,
                   x_title  = None,
                   y_title  = None,
                   series_colors = None,
-                  step = 1):
+                  step = 1,
+                  adaptive = False,
+                  max_points = 1000,
+                  resolution = None,
+                  decimate = False):
 
     """
         - Function to plot functions.
 
-        function_plot(name, data, width, height, background = "white light_gray", border = 0, axis = True, grid = False, dots = False, x_labels = None, y_labels = None, x_bounds = None, y_bounds = None, step = 1, discrete = False)
+        function_plot(name, data, width, height, background = "white light_gray", border = 0, axis = True, grid = False, dots = False, x_labels = None, y_labels = None, x_bounds = None, y_bounds = None, step = 1, discrete = False, adaptive = False, max_points = 1000, resolution = None, decimate = False)
 
         - Parameters
 
@@ -2150,7 +2634,11 @@ def function_plot(name,
         x_labels, y_labels - lists of strings containing the horizontal and vertical labels for the axis;
         x_bounds, y_bounds - tuples containing the lower and upper value bounds for the data to be plotted;
         step - the horizontal distance from one point to the other. The smaller, the smoother the curve will be;
-        discrete - whether or not the function should be plotted in discrete format.
+        discrete - whether or not the function should be plotted in discrete format;
+        adaptive - whether or not to place points where the curve bends, instead of every step;
+        max_points - the most points evaluated for each function when adaptive;
+        resolution - if set, points per pixel of the plot's width (replaces step and max_points);
+        decimate - whether or not to draw lines with only a few points per pixel column.
 
         - Example of use
 
@@ -2160,7 +2648,8 @@ def function_plot(name,
 
     plot = FunctionPlot( name, data, width, height, background, border,
                          axis, discrete, dots, grid, series_legend, x_labels, y_labels,
-                         x_bounds, y_bounds, x_title, y_title, series_colors, step )
+                         x_bounds, y_bounds, x_title, y_title, series_colors, step,
+                         adaptive, max_points, resolution, None, decimate )
     plot.render()
     plot.commit()
 
@@ -0,0 +1,97 @@
+"""Exporting many plots at once, using several processes.
+
+A job is a tuple (plot, args, kwargs), where plot is the name of one of
+cairoplot's module-level helpers (like "function_plot") or any other
+module-level function, and args and kwargs are what it is called with.
+Usually the first argument is the output filename, whose extension picks
+the file type (see Plot.create_surface).
+
+    jobs = [("dot_line_plot", ("sales.png", [1, 4, 2]), {"axis": True}),
+            ("pie_plot", ("share.pdf", {"a": 1, "b": 2}), {})]
+    for result in cairoplot.batch.export(jobs):
+        print result.seconds, result.error
+
+Jobs are sent to other processes, so everything in them must be
+picklable: data can't contain lambdas (use module-level functions).
+"""
+
+import time
+import traceback
+
+try:
+    import multiprocessing
+except ImportError:
+    # python 2.5: render in this process
+    multiprocessing = None
+
+import cairoplot
+
+
+class Result(object):
+    """Outcome of a job: time taken and error (None if it succeeded)."""
+
+    def __init__(self, job, seconds, error=None, details=None):
+        """Saves result of job.
+
+        error is a one line description of the exception raised,
+        and details is its whole traceback.
+        """
+
+        self.job = job
+        self.seconds = seconds
+        self.error = error
+        self.details = details
+
+    def __repr__(self):
+        if self.error is None:
+            return "<Result %r: %.3fs>" % (self.job[0], self.seconds)
+        return "<Result %r: %s>" % (self.job[0], self.error)
+
+
+def _job(job):
+    """Returns job as (plot, args, kwargs), filling in missing kwargs."""
+
+    if len(job) == 2:
+        return (job[0], tuple(job[1]), {})
+    plot, args, kwargs = job
+    return (plot, tuple(args), dict(kwargs or {}))
+
+
+def _run(job):
+    """Runs job, returning (seconds, error, details) for its Result."""
+
+    plot, args, kwargs = job
+    start = time.time()
+    try:
+        if isinstance(plot, basestring):
+            plot = getattr(cairoplot, plot)
+        plot(*args, **kwargs)
+    except Exception:
+        lines = traceback.format_exc().splitlines()
+        return (time.time() - start, lines[-1], "\n".join(lines))
+    return (time.time() - start, None, None)
+
+
+def export(jobs, processes=None, chunksize=1):
+    """Runs all jobs, returning a list of their Results (in job order).
+
+    processes - number of processes to use (default: one per cpu).
+                With 1 (or without multiprocessing), jobs run here;
+    chunksize - number of jobs sent to a process at a time, larger
+                chunks mean less overhead for many small plots.
+
+    A failing job doesn't stop the others; its Result has the error.
+    """
+
+    jobs = [_job(job) for job in jobs]
+    if processes == 1 or multiprocessing is None or len(jobs) < 2:
+        outcomes = map(_run, jobs)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            outcomes = pool.map(_run, jobs, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+
+    return [Result(job, *outcome) for job, outcome in zip(jobs, outcomes)]
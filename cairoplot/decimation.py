@@ -0,0 +1,66 @@
+"""Reduction of dense lines to a few points per pixel column."""
+
+import math
+
+
+def _reduce(run):
+    """Returns first, lowest, highest and last points of run (in order)."""
+
+    if len(run) <= 4:
+        return run
+
+    lowest = highest = 0
+    for index, point in enumerate(run):
+        if point[1] < run[lowest][1]:
+            lowest = index
+        elif point[1] > run[highest][1]:
+            highest = index
+
+    indices = sorted(set((0, lowest, highest, len(run) - 1)))
+    return [run[index] for index in indices]
+
+
+def decimate(points, xmin, scale):
+    """Returns points reduced to at most four for each pixel column.
+
+    points - list of (x, y) or (x, y, z) tuples, in drawing order;
+    xmin - x value at the left edge of the plot;
+    scale - pixels per unit of x.
+
+    Consecutive points falling in the same pixel column are replaced by
+    the first, lowest, highest and last of them, which draws the same
+    line. Undefined (nan) points are always kept, so gaps stay gaps.
+
+    >>> decimate([(0, 0), (0.1, 3), (0.2, -1), (0.3, 2), (0.4, 1), (1, 5)], 0, 1)
+    [(0, 0), (0.1, 3), (0.2, -1), (0.4, 1), (1, 5)]
+    """
+
+    if not scale:
+        return points
+
+    kept = []
+    run = []
+    column = None
+    for point in points:
+        # nan points end the current run
+        if point[1] != point[1]:
+            kept.extend(_reduce(run))
+            kept.append(point)
+            run = []
+            column = None
+            continue
+
+        pointcolumn = math.floor((point[0] - xmin) * scale)
+        if pointcolumn != column:
+            kept.extend(_reduce(run))
+            run = []
+            column = pointcolumn
+        run.append(point)
+
+    kept.extend(_reduce(run))
+    return kept
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -12,20 +12,74 @@ class GTKHandler(_Handler, gtk.DrawingArea):
         """Create Handler for arbitrary surfaces."""
         _Handler.__init__(self)
         gtk.DrawingArea.__init__(self)
-       
+
         # users of this class must set plot manually
         self.plot = None
         self.context = None
 
+        # plot is rendered once to an offscreen surface,
+        # which is copied to the window on expose
+        self.surface = None
+        self.surface_size = None
+
         # connect events for resizing/redrawing
         self.connect("expose_event", self.on_expose_event)
 
-    def on_expose_event(self, widget, data):
-        """Redraws plot if need be."""
-        
-        self.context = widget.window.cairo_create()
-        if (self.plot is not None):
-            self.plot.render()
+    def on_expose_event(self, widget, event):
+        """Copies exposed area from rendered plot, rendering if need be."""
+        if self.plot is None:
+            return
+
+        allocation = self.get_allocation()
+        size = (allocation.width, allocation.height)
+        if self.surface is None or self.surface_size != size:
+            self.render_surface(size)
+
+        # only paint the area that needs it
+        context = widget.window.cairo_create()
+        area = event.area
+        context.rectangle(area.x, area.y, area.width, area.height)
+        context.clip()
+        context.set_source_surface(self.surface, 0, 0)
+        context.paint()
+
+    def render_surface(self, size):
+        """Renders plot to a new offscreen surface of size (width, height)."""
+        target = self.window.cairo_create().get_target()
+        self.surface = target.create_similar(cairo.CONTENT_COLOR_ALPHA,
+                size[0], size[1])
+        self.surface_size = size
+        self.context = cairo.Context(self.surface)
+        self.plot.render()
+
+    def invalidate(self):
+        """Renders the plot again on the next expose.
+
+        Call this after changing the plot's data or style.
+        """
+        self.surface = None
+        self.queue_draw()
+
+    def refresh(self, plot):
+        """Draws plot's new points on its layer, scrolling it if need be
+        (see ScatterPlot.render_live), and redraws the plot. If the plot
+        must all be rendered again (see ScatterPlot.append), it is on
+        the next expose.
+        """
+        if plot is not self.plot:
+            return
+        if self.surface is None or plot.new_points is None or plot.layer is None:
+            self.invalidate()
+            return
+
+        plot.context = self.context
+        plot.render_live()
+        self.queue_draw()
+
+    def set_plot(self, plot):
+        """Displays plot instead of the current one."""
+        self.plot = plot
+        self.invalidate()
 
     def prepare(self, plot):
         """Update plot's size and context with custom widget."""
@@ -33,6 +87,11 @@ class GTKHandler(_Handler, gtk.DrawingArea):
         self.plot = plot
         plot.context = self.context
 
+        # live plots draw their data on a layer, that can be scrolled
+        if getattr(plot, 'live', False):
+            plot.layer = cairo.Context(self.surface.create_similar(
+                    cairo.CONTENT_COLOR_ALPHA, *self.surface_size))
+
         allocation = self.get_allocation()
         plot.dimensions[cairoplot.HORZ] = allocation.width
         plot.dimensions[cairoplot.VERT] = allocation.height
@@ -9,3 +9,10 @@ class Handler(object):
         """All handlers need to finalize the cairo context."""
         plot.context.show_page()
 
+    def refresh(self, plot):
+        """Shows points added to plot (see ScatterPlot.append).
+
+        Handlers that output the plot once have nothing to do.
+        """
+        pass
+
@@ -0,0 +1,336 @@
+"""Streaming loaders for CSV and binary files.
+
+Files are read a chunk at a time and their points are decimated as they
+arrive, so plotting a file of any size takes about the same memory:
+
+    series = cairoplot.loaders.load_csv("log.csv", x=0, y=[1, 2],
+                                        header=True)
+    cairoplot.dot_line_plot("log.png", series, 800, 400, axis=True)
+
+Points are kept in buckets of consecutive points, and each bucket only
+remembers its first, lowest, highest and last points (and its first
+undefined one, so gaps stay gaps). When there are too many buckets,
+neighbours are merged, doubling the points per bucket. With about as
+many buckets as the plot is wide, each bucket is a pixel column or
+less, and the line looks the same as with all the points (see
+decimation).
+"""
+
+import csv
+import struct
+
+from series import Series, ArrayGroup
+
+# buckets kept for each group (a little over the width of large plots)
+DEFAULT_BUCKETS = 2048
+
+# rows read at a time
+CHUNK_SIZE = 4096
+
+
+class _Bucket(object):
+    """Consecutive points reduced to first, lowest, highest and last.
+
+    Points are kept as (index, point) pairs, so they can be put back in
+    order.
+    """
+
+    __slots__ = ("count", "first", "lowest", "highest", "last", "gap")
+
+    def __init__(self, entry):
+        """Starts bucket with entry, an (index, (x, y)) pair."""
+        self.count = 1
+        self.first = self.last = None
+        self.lowest = self.highest = None
+        self.gap = None
+        self._add(entry)
+
+
+    def _add(self, entry):
+        """Adds entry, without counting it."""
+
+        y = entry[1][1]
+        if y != y:
+            if self.gap is None:
+                self.gap = entry
+            return
+        if self.first is None:
+            self.first = self.lowest = self.highest = entry
+        elif y < self.lowest[1][1]:
+            self.lowest = entry
+        elif y > self.highest[1][1]:
+            self.highest = entry
+        self.last = entry
+
+
+    def add(self, entry):
+        """Adds entry, the next point."""
+        self.count += 1
+        self._add(entry)
+
+
+    def merge(self, other):
+        """Adds all points of other, the next bucket."""
+
+        self.count += other.count
+        if self.gap is None:
+            self.gap = other.gap
+        if other.first is None:
+            return
+        if self.first is None:
+            self.first = other.first
+            self.lowest = other.lowest
+            self.highest = other.highest
+        else:
+            if other.lowest[1][1] < self.lowest[1][1]:
+                self.lowest = other.lowest
+            if other.highest[1][1] > self.highest[1][1]:
+                self.highest = other.highest
+        self.last = other.last
+
+
+    def entries(self):
+        """Returns the kept entries, in order."""
+        entries = set([self.first, self.lowest, self.highest, self.last,
+                       self.gap])
+        entries.discard(None)
+        return sorted(entries)
+
+
+class Decimator(object):
+    """Reduces a stream of (x, y) points to a bounded number.
+
+    At most about 8 points for each of buckets are kept (see the module
+    documentation), however many points are added.
+
+    With one bucket, at most two are kept, so six points are merged into
+    two buckets of four (the last one isn't full), and (2, 1) is dropped:
+
+    >>> decimator = Decimator(1)
+    >>> decimator.add(enumerate([0, 5, 1, 2, 9, 3])); decimator.size
+    4
+    >>> decimator.points()
+    [(0, 0), (1, 5), (3, 2), (4, 9), (5, 3)]
+
+    The first undefined point of a bucket is kept, so gaps stay gaps:
+
+    >>> decimator = Decimator(1)
+    >>> decimator.add(enumerate([0, 5, float("nan"), 2, 9, 3, 7, 8, 1]))
+    >>> decimator.points()
+    [(0, 0), (2, nan), (4, 9), (7, 8), (8, 1)]
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Starts with no points."""
+        self.limit = buckets
+        self.size = 1
+        self.buckets = []
+        self.count = 0
+
+
+    def add(self, points):
+        """Adds points, a sequence of (x, y) tuples in drawing order."""
+
+        buckets = self.buckets
+        for point in points:
+            entry = (self.count, point)
+            self.count += 1
+            if buckets and buckets[-1].count < self.size:
+                buckets[-1].add(entry)
+            else:
+                buckets.append(_Bucket(entry))
+                if len(buckets) > 2*self.limit:
+                    self._merge()
+                    buckets = self.buckets
+
+
+    def _merge(self):
+        """Merges neighbouring buckets, halving their number."""
+
+        merged = self.buckets[::2]
+        for bucket, other in zip(merged, self.buckets[1::2]):
+            bucket.merge(other)
+        self.buckets = merged
+        self.size *= 2
+
+
+    def points(self):
+        """Returns list of the kept points, in order."""
+
+        points = []
+        for bucket in self.buckets:
+            points.extend([point for index, point in bucket.entries()])
+        return points
+
+
+    def group(self, name=None):
+        """Returns ArrayGroup of the kept points."""
+
+        group = ArrayGroup(name=name)
+        points = self.points()
+        if points:
+            group.data_list = [list(column) for column in zip(*points)]
+        return group
+
+
+def _open(file, mode):
+    """Returns (file object, whether it was opened here) for file,
+    a file name or an open file."""
+
+    if isinstance(file, basestring):
+        return open(file, mode), True
+    return file, False
+
+
+def _number(text):
+    """Returns text as a float (nan if it isn't a number)."""
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
+
+
+def read_csv(file, columns, delimiter=",", skip=0, chunksize=CHUNK_SIZE):
+    """Yields lists of up to chunksize rows of file (a name or open file).
+
+    Each row is a tuple of the floats in columns (a list of indexes).
+    Fields that aren't numbers are nan, and rows without all of the
+    columns are skipped, like the first skip lines.
+
+    >>> from StringIO import StringIO
+    >>> list(read_csv(StringIO("x,y\\n1,2\\n3\\n4,-\\n5,6\\n"), [0, 1], skip=1,
+    ...               chunksize=2))
+    [[(1.0, 2.0), (4.0, nan)], [(5.0, 6.0)]]
+    """
+
+    last = max(columns)
+    file, opened = _open(file, "rb")
+    try:
+        reader = csv.reader(file, delimiter=delimiter)
+        rows = []
+        for fields in reader:
+            if skip:
+                skip -= 1
+                continue
+            if len(fields) <= last:
+                continue
+            rows.append(tuple([_number(fields[column]) for column in columns]))
+            if len(rows) == chunksize:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+    finally:
+        if opened:
+            file.close()
+
+
+def read_binary(file, format, columns, offset=0, chunksize=CHUNK_SIZE):
+    """Yields lists of up to chunksize records of file (a name or open file).
+
+    Records have the struct format (like '<dd' for two little endian
+    doubles) and follow offset bytes of header. Each record is a tuple
+    of the floats in columns (a list of field indexes). An incomplete
+    record at the end is ignored.
+    """
+
+    record = struct.Struct(format)
+    file, opened = _open(file, "rb")
+    try:
+        if offset:
+            file.seek(offset, 1)
+        while True:
+            data = file.read(record.size * chunksize)
+            count = len(data) // record.size
+            if count == 0:
+                break
+            rows = []
+            for position in xrange(0, count*record.size, record.size):
+                fields = record.unpack_from(data, position)
+                rows.append(tuple([float(fields[column]) for column in columns]))
+            yield rows
+    finally:
+        if opened:
+            file.close()
+
+
+def _columns(x, y):
+    """Returns (columns to read, y columns) for x and y (see load_csv)."""
+
+    if type(y) not in (list, tuple):
+        y = [y]
+    if x is None:
+        return list(y), list(y)
+    return [x] + list(y), list(y)
+
+
+def _load(chunks, x, y, names, buckets):
+    """Returns Series with a decimated group for each y column of chunks."""
+
+    decimators = [Decimator(buckets) for column in y]
+    index = 0
+    for rows in chunks:
+        if x is None:
+            # x is the row number
+            xs = xrange(index, index + len(rows))
+            index += len(rows)
+            ys = zip(*rows)
+        else:
+            xs = [row[0] for row in rows]
+            ys = zip(*rows)[1:]
+        for decimator, values in zip(decimators, ys):
+            decimator.add(zip(xs, values))
+
+    series = Series()
+    for decimator, name in zip(decimators, names):
+        series.add_group(decimator.group(name))
+    return series
+
+
+def load_csv(file, x=0, y=1, delimiter=",", header=False,
+             buckets=DEFAULT_BUCKETS):
+    """Returns Series of the points in a CSV file, decimated as it's read.
+
+    file - file name or open file;
+    x - index of the x column, or None to use the row number;
+    y - index of the y column, or a list of them (one group each);
+    header - whether the first line has the column names (used as
+             the group names);
+    buckets - points are reduced to about 8 per bucket, use about
+              the width of the plot (see Decimator).
+    """
+
+    columns, y = _columns(x, y)
+    names = [None] * len(y)
+    file, opened = _open(file, "rb")
+    try:
+        if header:
+            # read_csv goes on reading the file where the header ends
+            for fields in csv.reader(file, delimiter=delimiter):
+                names = [column < len(fields) and fields[column] or None
+                         for column in y]
+                break
+        return _load(read_csv(file, columns, delimiter), x, y, names, buckets)
+    finally:
+        if opened:
+            file.close()
+
+
+def load_binary(file, format, x=0, y=1, offset=0, buckets=DEFAULT_BUCKETS):
+    """Returns Series of the points in a file of fixed size records,
+    decimated as it's read.
+
+    format - struct format of a record (like '<dd' or 'qf');
+    offset - bytes of header before the first record;
+    the other arguments are the same as for load_csv (x and y are
+    indexes of record fields).
+    """
+
+    columns, y = _columns(x, y)
+    chunks = read_binary(file, format, columns, offset)
+    return _load(chunks, x, y, [None] * len(y), buckets)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
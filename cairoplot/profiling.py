@@ -0,0 +1,202 @@
+"""Timing of the phases of rendering plots.
+
+A plot's render runs phases in turn (calc_all_extents, calc_steps,
+render_background, render_axis, render_grid, render_labels,
+render_plot, ...). With a Profile, each render is timed phase by phase
+and described by a Report. Phases called by another phase (like
+calc_angles from render_plot) are recorded with it as their parent, and
+each phase's own time leaves out theirs, so no time is counted twice:
+
+    profile = cairoplot.profiling.Profile()
+    plot = cairoplot.DotLinePlot("sales.png", data, 400, 300)
+    plot.profile = profile
+    plot.render()
+    print profile.last
+
+A Profile can be set on one plot (its profile attribute), or for all
+plots with enable. A callback given to the Profile is called with each
+Report, as soon as its render finishes. Plots can be rendered in
+several threads at once, each is profiled separately.
+
+Without a Profile, rendering isn't slowed down.
+"""
+
+import threading
+import time
+
+# methods timed during a render (the ones plots don't have are skipped)
+PHASES = ("calc_all_extents", "calc_horz_extents", "calc_vert_extents",
+          "calc_steps", "calc_angles", "render_background",
+          "render_bounding_box", "render_shadow", "render_axis",
+          "render_grid", "render_ground", "render_labels",
+          "render_series_labels", "render_values", "render_plot",
+          "render_errors", "render_legend")
+
+# reports kept by a Profile (oldest are forgotten)
+KEPT_REPORTS = 100
+
+# profile of plots without their own (see enable)
+_default = None
+
+
+def enable(callback=None):
+    """Profiles renders of all plots without a profile of their own.
+
+    Returns the new Profile (see Profile for callback).
+    """
+    global _default
+    _default = Profile(callback)
+    return _default
+
+
+def disable():
+    """Stops profiling plots without a profile of their own."""
+    global _default
+    _default = None
+
+
+def profiled(render):
+    """Decorates a plot's render method, to profile it (if enabled)."""
+
+    def profiled_render(plot, *args, **kwargs):
+        profile = getattr(plot, "profile", None) or _default
+        if profile is None or id(plot) in profile.rendering:
+            # (a render calling its base class' is part of the same run)
+            return render(plot, *args, **kwargs)
+        return profile.run(plot, render, args, kwargs)
+
+    profiled_render.__name__ = render.__name__
+    profiled_render.__doc__ = render.__doc__
+    return profiled_render
+
+
+class Report(object):
+    """Times of a render and of each of its phases (in seconds).
+
+    phases is a list of (name, parent, seconds, own) in the order the
+    phases started: parent is the index of the phase that called it
+    (None for phases called by render), seconds is all of its time and
+    own leaves out the phases it called.
+    """
+
+    def __init__(self, plot):
+        """Starts report of a render of plot."""
+        self.plot = plot.__class__.__name__
+        self.phases = []
+        self.total = 0.0
+
+
+    def get_other(self):
+        """Returns time not spent in any of the phases."""
+        return self.total - sum(own for name, parent, seconds, own
+                                in self.phases)
+
+
+    def to_dict(self):
+        """Returns report as a dictionary (like for json)."""
+        return {"plot": self.plot, "total": self.total,
+                "other": self.get_other(),
+                "phases": [{"name": name, "parent": parent,
+                            "seconds": seconds, "own": own}
+                           for name, parent, seconds, own in self.phases]}
+
+
+    def __str__(self):
+        lines = ["%s: %.2f ms (own time in brackets)" % (self.plot,
+                self.total * 1000)]
+        depths = []
+        for name, parent, seconds, own in self.phases + [
+                ("other", None, self.get_other(), self.get_other())]:
+            depth = 0
+            if parent is not None:
+                depth = depths[parent] + 1
+            depths.append(depth)
+            share = 0.0
+            if self.total:
+                share = 100 * own / self.total
+            lines.append("  %-22s %8.2f ms (%8.2f ms) %5.1f%%" % (
+                    "  " * depth + name, seconds * 1000, own * 1000, share))
+        return "\n".join(lines)
+
+
+class Profile(object):
+    """Collects Reports of renders."""
+
+    def __init__(self, callback=None):
+        """Starts with no reports.
+
+        callback - function called with each Report when its render
+                   finishes (None for no callback).
+        """
+        self.callback = callback
+        self.reports = []
+
+        # ids of the plots being rendered (in any thread)
+        self.rendering = set()
+        self.lock = threading.Lock()
+
+
+    def get_last(self):
+        """Returns Report of the last render (None if there wasn't one)."""
+        if self.reports:
+            return self.reports[-1]
+        return None
+
+    last = property(get_last)
+
+
+    def run(self, plot, render, args, kwargs):
+        """Renders plot (with render, its method), timing its phases."""
+
+        report = Report(plot)
+
+        # phases being run (indexes in phases, with the time of the
+        #  phases they called)
+        phases = []
+        running = []
+
+        def timed(name, method):
+            def phase(*args, **kwargs):
+                parent = None
+                if running:
+                    parent = running[-1][0]
+                index = len(phases)
+                phases.append(None)
+                running.append([index, 0.0])
+                start = time.time()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    seconds = time.time() - start
+                    nested = running.pop()[1]
+                    if running:
+                        running[-1][1] += seconds
+                    phases[index] = (name, parent, seconds, seconds - nested)
+            return phase
+
+        # phases are replaced (for this plot) while it renders
+        replaced = []
+        for name in PHASES:
+            method = getattr(plot, name, None)
+            if method is not None and name not in plot.__dict__:
+                setattr(plot, name, timed(name, method))
+                replaced.append(name)
+
+        self.rendering.add(id(plot))
+        start = time.time()
+        try:
+            return render(plot, *args, **kwargs)
+        finally:
+            report.total = time.time() - start
+            report.phases = phases
+            self.rendering.discard(id(plot))
+            for name in replaced:
+                delattr(plot, name)
+            self.lock.acquire()
+            try:
+                self.reports.append(report)
+                del self.reports[:-KEPT_REPORTS]
+            finally:
+                self.lock.release()
+            if self.callback is not None:
+                self.callback(report)
@@ -0,0 +1,474 @@
+"""Evaluation and sampling of functions for FunctionPlot."""
+
+import heapq
+import math
+import random
+import threading
+import time
+
+NAN = float("nan")
+INFINITY = float("inf")
+
+# math errors that mean a point is undefined (plotted as a gap)
+EVALUATION_ERRORS = (ValueError, ZeroDivisionError, OverflowError)
+
+# adaptive sampling defaults
+# (tolerance is a fraction of the plot's height, 0.001 is half a pixel
+#  on a 500 pixel plot)
+ADAPTIVE_TOLERANCE = 0.001
+ADAPTIVE_INITIAL_POINTS = 17
+
+# slowest intervals kept by EvaluationStats
+SLOWEST_INTERVALS = 5
+
+# points evaluated between checks of a Budget
+BUDGET_CHUNK = 64
+
+# most points timed together for EvaluationStats (smaller chunks find
+#  slow x ranges more precisely, but cost more calls)
+STATS_CHUNK = 64
+
+# marks values that aren't in a SampleCache
+_MISSING = object()
+
+
+def isfinite(value):
+    """Returns True if value is neither nan nor infinite."""
+    return value == value and value not in (INFINITY, -INFINITY)
+
+
+class EvaluationStats(object):
+    """Cost of evaluating a function: counts, time and slowest intervals."""
+
+    def __init__(self, name=None):
+        """Starts with no evaluations (of the function called name)."""
+        self.name = name
+        self.evaluations = 0
+        self.seconds = 0.0
+        self.undefined = 0
+        self.errors = 0
+        self._slowest = []
+
+
+    def add(self, points, values, seconds):
+        """Records that evaluating points (giving values) took seconds."""
+
+        if not points:
+            return
+        self.evaluations += len(points)
+        self.seconds += seconds
+        self.undefined += len([y for y in values if y != y])
+
+        # keep the intervals that took longest per point
+        interval = (seconds / len(points), min(points), max(points))
+        heapq.heappush(self._slowest, interval)
+        if len(self._slowest) > SLOWEST_INTERVALS:
+            heapq.heappop(self._slowest)
+
+
+    def get_average(self):
+        """Returns seconds per evaluation (0 if there were none)."""
+        if not self.evaluations:
+            return 0.0
+        return self.seconds / self.evaluations
+
+
+    def get_slowest(self):
+        """Returns list of the slowest intervals, slowest first.
+
+        Each is (xmin, xmax, seconds per evaluation) of points timed
+        together: at most STATS_CHUNK neighbouring points (like the
+        refinements of adaptive sampling).
+        """
+        return [(xmin, xmax, seconds) for seconds, xmin, xmax in
+                sorted(self._slowest, reverse=True)]
+
+
+    def to_dict(self):
+        """Returns stats as a dictionary (like for json)."""
+        return {"name": self.name, "evaluations": self.evaluations,
+                "seconds": self.seconds, "average": self.get_average(),
+                "undefined": self.undefined, "errors": self.errors,
+                "slowest": self.get_slowest()}
+
+
+    def __str__(self):
+        text = "%s: %d evaluations in %.2f ms (%.1f us each), %d undefined" % (
+                self.name, self.evaluations, self.seconds * 1000,
+                self.get_average() * 1e6, self.undefined)
+        if self._slowest:
+            xmin, xmax, seconds = self.get_slowest()[0]
+            text += ", slowest at %g..%g (%.1f us each)" % (xmin, xmax,
+                    seconds * 1e6)
+        return text
+
+
+class Budget(object):
+    """Limits the time and number of evaluations spent sampling a plot.
+
+    Once either runs out, the remaining points aren't evaluated (and
+    are left out of plots, see evaluate), so a function that's too slow
+    can't hold up a plot (or a batch of them) for ever. The budget is
+    checked every BUDGET_CHUNK points, so it may be overrun by that many
+    evaluations.
+    """
+
+    def __init__(self, seconds=None, evaluations=None):
+        """Creates budget of seconds and evaluations (None for no limit)."""
+        self.seconds = seconds
+        self.evaluations = evaluations
+        self.start()
+
+
+    def start(self):
+        """Starts spending the whole budget again (as for a new plot)."""
+        self.started = time.time()
+        self.spent = 0
+        self.skipped = 0
+
+
+    def spend(self, count):
+        """Returns how many of count more evaluations the budget allows.
+
+        The ones that aren't allowed are counted in skipped.
+
+        >>> budget = Budget(evaluations=100)
+        >>> budget.spend(64), budget.spend(64), budget.spend(8)
+        (64, 36, 0)
+        >>> budget.spent, budget.skipped
+        (100, 36)
+        >>> Budget(seconds=0).spend(5)
+        0
+        """
+
+        allowed = count
+        if (self.seconds is not None and
+            time.time() - self.started >= self.seconds):
+            allowed = 0
+        if self.evaluations is not None:
+            allowed = max(0, min(allowed, self.evaluations - self.spent))
+        self.spent += allowed
+        self.skipped += count - allowed
+        return allowed
+
+
+def evaluate(function, points, stats=None, budget=None, skipped=NAN):
+    """Returns list of function evaluated at all points.
+
+    Points that can't be evaluated (math errors) are nan. If the function
+    has a vectorized attribute, all points are evaluated in one call.
+    With stats (EvaluationStats), the evaluations are recorded, timing
+    STATS_CHUNK points at a time (so points aren't slowed down). Errors
+    of vectorized functions are only counted if the function has a true
+    counts_errors attribute: its vectorized then takes a list as second
+    argument, whose first item it adds the number of errors to.
+    With a Budget, points are evaluated a chunk at a time, and once it
+    has run out the rest are skipped (given the value skipped, so they
+    can be told from undefined points).
+    """
+
+    if budget is not None:
+        values = []
+        for start in xrange(0, len(points), BUDGET_CHUNK):
+            chunk = points[start:start + BUDGET_CHUNK]
+            allowed = budget.spend(len(chunk))
+            values.extend(evaluate(function, chunk[:allowed], stats))
+            values.extend([skipped] * (len(chunk) - allowed))
+        return values
+
+    if stats is None:
+        return _evaluate(function, points, [0])
+
+    values = []
+    for start in xrange(0, len(points), STATS_CHUNK):
+        chunk = points[start:start + STATS_CHUNK]
+        errors = [0]
+        started = time.time()
+        chunk_values = _evaluate(function, chunk, errors)
+        stats.add(chunk, chunk_values, time.time() - started)
+        stats.errors += errors[0]
+        values.extend(chunk_values)
+    return values
+
+
+def _evaluate(function, points, errors):
+    """Returns list of function at all points (see evaluate), adding the
+    number of errors to errors[0] (when they can be counted)."""
+
+    vectorized = getattr(function, "vectorized", None)
+    if vectorized is not None:
+        if getattr(function, "counts_errors", False):
+            return vectorized(points, errors)
+        return vectorized(points)
+
+    values = []
+    for x in points:
+        try:
+            values.append(function(x))
+        except EVALUATION_ERRORS:
+            values.append(NAN)
+            errors[0] += 1
+    return values
+
+
+def uniform(xmin, xmax, step):
+    """Returns list of points from xmin to xmax (inclusive) every step."""
+    points = []
+    x = xmin
+    while x <= xmax:
+        points.append(x)
+        x += step
+    return points
+
+
+def quantize(step):
+    """Returns largest power of two not greater than step."""
+    return 2.0 ** math.floor(math.log(step, 2))
+
+
+def anchored(xmin, xmax, step, jitter=0.0):
+    """Returns points at multiples of step between xmin and xmax.
+
+    Unlike uniform, the points don't depend on where the range starts,
+    so overlapping ranges share points (see SampleCache). If jitter is
+    set, each point is moved by up to jitter steps, the same way for the
+    same multiple. The ends, xmin and xmax, are always included.
+    """
+
+    points = [xmin]
+    first = int(math.floor(xmin / step)) + 1
+    last = int(math.ceil(xmax / step)) - 1
+    for k in xrange(first, last + 1):
+        offset = 0.0
+        if jitter:
+            offset = jitter * ((k * 2654435761 % 1000) / 500.0 - 1.0)
+        x = (k + offset) * step
+        if xmin < x < xmax:
+            points.append(x)
+    if xmax > xmin:
+        points.append(xmax)
+    return points
+
+
+class SampleCache(object):
+    """Remembers function values from previous plots.
+
+    Values are stored by function and x, so plotting the same functions
+    over an overlapping range only evaluates the points that are new.
+    Use with anchored points, since points from uniform shift with xmin.
+
+    A cache can be shared by threads: it is locked while it's read or
+    changed, but not while functions are evaluated.
+    """
+
+    def __init__(self):
+        """Creates an empty cache."""
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+    def evaluate(self, function, points, stats=None, budget=None,
+                 skipped=NAN):
+        """Returns list of function at all points, evaluating only new ones.
+
+        With stats or a budget, the new evaluations are recorded or
+        limited (see evaluate). Points skipped by the budget aren't kept.
+        """
+
+        self.lock.acquire()
+        try:
+            values = self.values.setdefault(function, {})
+            missing = [x for x in points if x not in values]
+        finally:
+            self.lock.release()
+
+        # skipped points are always the last ones
+        kept = len(missing)
+        if budget is not None:
+            skipped_before = budget.skipped
+        evaluated = evaluate(function, missing, stats, budget, skipped)
+        if budget is not None:
+            kept -= budget.skipped - skipped_before
+
+        self.lock.acquire()
+        try:
+            # keep evaluated values even if keep has replaced them since
+            values = self.values.setdefault(function, values)
+            for x, y in zip(missing[:kept], evaluated):
+                values[x] = y
+            self.misses += len(missing)
+            self.hits += len(points) - len(missing)
+            found = [values.get(x, _MISSING) for x in points]
+        finally:
+            self.lock.release()
+
+        # skipped values, and values forgotten by keep (in another
+        #  thread), are missing from the cache
+        new = dict(zip(missing, evaluated))
+        for i, y in enumerate(found):
+            if y is _MISSING:
+                y = new.get(points[i], _MISSING)
+                if y is _MISSING:
+                    y = evaluate(function, [points[i]], stats, budget,
+                                 skipped)[0]
+                found[i] = y
+        return found
+
+
+    def keep(self, functions, xmin, xmax):
+        """Forgets other functions, and points far from xmin and xmax.
+
+        Points within one range width of either side are kept, so panning
+        back and forth stays cheap.
+        """
+
+        margin = xmax - xmin
+        low = xmin - margin
+        high = xmax + margin
+
+        self.lock.acquire()
+        try:
+            kept = {}
+            for function in functions:
+                if function not in self.values:
+                    continue
+                values = self.values[function]
+                kept[function] = dict((x, values[x]) for x in values
+                                      if low <= x <= high)
+            self.values = kept
+        finally:
+            self.lock.release()
+
+
+def adaptive(function, xmin, xmax, max_points=1000,
+             tolerance=ADAPTIVE_TOLERANCE, initial=ADAPTIVE_INITIAL_POINTS,
+             cache=None, stats=None, budget=None):
+    """Samples function between xmin and xmax with at most max_points.
+
+    Starts with a coarse grid, then repeatedly splits the interval
+    whose midpoint is furthest from the straight line between its ends
+    (measured as a fraction of the curve's height), until every interval
+    is within tolerance or max_points evaluations have been made.
+    Intervals where the function becomes undefined are split too, so gaps
+    and asymptotes get sharp edges.
+
+    If a SampleCache is given, the coarse grid is anchored (see anchored),
+    so plots of overlapping ranges reuse most of the same points.
+    With stats (EvaluationStats) or a Budget, the evaluations are
+    recorded or limited (see evaluate). Once the budget has run out,
+    refining stops, and the points it skipped are left out.
+
+    Returns a list of (x, y) points sorted by x.
+
+    A line fits the coarse grid (17 points and their midpoints), while
+    points are added around the corner of abs, up to max_points:
+
+    >>> len(adaptive(lambda x: 2 * x, 0, 1))
+    33
+    >>> points = adaptive(abs, -1, 1, max_points=40)
+    >>> len(points), points == sorted(points)
+    (39, True)
+    >>> min([abs(x) for x, y in adaptive(abs, -1, 1)]) < 0.001
+    True
+
+    Points missed by a budget are left out:
+
+    >>> budget = Budget(evaluations=20)
+    >>> len(adaptive(math.sqrt, 0, 1, budget=budget)), budget.skipped
+    (20, 13)
+    """
+
+    evaluator = evaluate
+    if cache is not None:
+        evaluator = cache.evaluate
+
+    def evaluatepoints(function, points):
+        return evaluator(function, points, stats, budget, None)
+
+    initial = max(2, min(initial, (max_points + 1) / 2))
+    if xmax <= xmin:
+        return [(x, y) for x, y in zip([xmin], evaluatepoints(function, [xmin]))
+                if y is not None]
+
+    # evaluate coarse grid, and the midpoint of each of its intervals
+    # interior points are jittered (the same way every time), so periodic
+    #  functions can't hide between evenly spaced points
+    width = float(xmax - xmin)
+    step = width / (initial - 1)
+    if cache is not None:
+        xs = anchored(xmin, xmax, quantize(step), 0.25)
+    else:
+        jitter = random.Random(initial)
+        xs = [xmin] + [xmin + step * (i + jitter.uniform(-0.25, 0.25))
+                       for i in range(1, initial - 1)] + [xmax]
+    middles = [(x0 + x1) / 2.0 for x0, x1 in zip(xs[:-1], xs[1:])]
+    ys = evaluatepoints(function, xs + middles)
+    points = zip(xs + middles, ys)
+    if None in ys:
+        # the budget ran out
+        points = [(x, y) for x, y in points if y is not None]
+        points.sort()
+        return points
+
+    # errors are measured relative to the size of the curve
+    finite = [y for y in ys if isfinite(y)]
+    height = 1.0
+    if finite and max(finite) > min(finite):
+        height = float(max(finite) - min(finite))
+    smallest = width * 1e-9
+
+    def error(x0, y0, xm, ym, x1, y1):
+        """Returns how badly a line from (x0, y0) to (x1, y1) fits ym."""
+        defined = (isfinite(y0), isfinite(ym), isfinite(y1))
+        if defined == (True, True, True):
+            line = y0 + (y1 - y0) * (xm - x0) / (x1 - x0)
+            return abs(ym - line) / height
+        elif True in defined:
+            # edge of the function's domain: refine by width
+            return (x1 - x0) / width
+        return 0.0
+
+    # priority queue of intervals, worst fit first
+    intervals = []
+    ends = points[:len(xs)]
+    for i, (xm, ym) in enumerate(points[len(xs):]):
+        (x0, y0), (x1, y1) = ends[i], ends[i + 1]
+        heapq.heappush(intervals,
+            (-error(x0, y0, xm, ym, x1, y1), x0, y0, xm, ym, x1, y1))
+
+    evaluations = len(points)
+    while intervals and evaluations + 2 <= max_points:
+        worst = heapq.heappop(intervals)
+        if -worst[0] <= tolerance:
+            break
+        x0, y0, xm, ym, x1, y1 = worst[1:]
+        if x1 - x0 < smallest:
+            continue
+
+        # split interval at its midpoint, and evaluate the new midpoints
+        left = (x0 + xm) / 2.0
+        right = (xm + x1) / 2.0
+        yleft, yright = evaluatepoints(function, [left, right])
+        if yleft is None or yright is None:
+            # the budget ran out
+            points.extend([(x, y) for x, y in ((left, yleft), (right, yright))
+                           if y is not None])
+            break
+        evaluations += 2
+        points.append((left, yleft))
+        points.append((right, yright))
+        heapq.heappush(intervals,
+            (-error(x0, y0, left, yleft, xm, ym), x0, y0, left, yleft, xm, ym))
+        heapq.heappush(intervals,
+            (-error(xm, ym, right, yright, x1, y1),
+             xm, ym, right, yright, x1, y1))
+
+    points.sort()
+    return points
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -26,10 +26,15 @@
 
 #import cairoplot
 import doctest
+import mmap
+import struct
+from array import array
+from collections import deque
 
 NUMTYPES = (int, float, long)
 LISTTYPES = (list, tuple)
 STRTYPES = (str, unicode)
+BUFFERTYPES = (array, mmap.mmap, buffer)
 FILLING_TYPES = ['linear', 'solid', 'gradient']
 DEFAULT_COLOR_FILLING = 'solid'
 #TODO: Define default color list
@@ -144,6 +149,10 @@ class Data(object):
                 Ensures that data is a valid tuple/list or a number (int, float
                 or long)
             """
+            # the group's bounds change with its data
+            if self.parent is not None:
+                self.parent.invalidate()
+
             # Type: None
             if data is None:
                 self.__content = None
@@ -285,6 +294,7 @@ class Group(object):
         self.__data_list = []
         self.__range = []
         self.__name = None
+        self.__bounds = None
 
 
         self.parent = parent
@@ -367,6 +377,8 @@ class Group(object):
             """
                 Ensures that group is valid.
             """
+            self.invalidate()
+
             # None
             if group is None:
                 self.__data_list = []
@@ -555,9 +567,88 @@ class Group(object):
             data = Data(data,name,self)
 
         if data.content is not None:
+            self.invalidate()
             self.__data_list.append(data.copy())
             self.__data_list[-1].parent = self
 
+    def get_bounds(self):
+        """
+            Returns a list with the (min, max) of each coordinate (x, y and
+            z) of the group's data, or None for missing coordinates.
+            Numbers are y values, with their index as x. Undefined (nan)
+            values are skipped.
+
+            The bounds are kept until the group changes, through its
+            methods or its data (see invalidate).
+
+            Usage:
+            >>> Group([(1,2),(3,-1)]).get_bounds()
+            [(1, 3), (-1, 2), None]
+            >>> Group([5,7,6]).get_bounds()
+            [(0, 2), (5, 7), None]
+        """
+        if self.__bounds is None:
+            bounds = [column_bounds(column) for column in self.get_columns()]
+            self.__bounds = (bounds + [None, None, None])[:3]
+        return list(self.__bounds)
+
+    def get_columns(self):
+        """
+            Returns a list with a sequence of the values of each coordinate
+            (numbers get their index as x).
+
+            Usage:
+            >>> Group([(1,2),(3,4,5)]).get_columns()
+            [[1, 3], [2, 4], [5]]
+        """
+        contents = [data.content for data in self]
+        if not contents:
+            return []
+        if type(contents[0]) in NUMTYPES:
+            return [xrange(len(contents)), contents]
+        if len(set(map(len, contents))) == 1:
+            return map(list, zip(*contents))
+        return [[content[index] for content in contents if len(content) > index]
+                for index in range(max(map(len, contents)))]
+
+    def invalidate(self):
+        """
+            Forgets the group's bounds (and its series'), after changing
+            its data. Changing the data list or contents of its data does
+            this already.
+        """
+        if self.__bounds is not None:
+            self.__bounds = None
+            if self.parent is not None:
+                self.parent.invalidate()
+
+    def update_bounds(self, added=None, removed=None):
+        """
+            Updates the kept bounds after adding a point (content added)
+            or removing one (content removed), without going through all
+            the data. If the removed point was at a bound, or the group
+            has numbers, they are calculated again when needed.
+        """
+        bounds = self.__bounds
+        if bounds is None:
+            return
+        if type(added) in NUMTYPES or type(removed) in NUMTYPES:
+            self.invalidate()
+            return
+
+        if removed is not None:
+            for bound, value in zip(bounds, removed):
+                if bound is not None and value in bound:
+                    self.invalidate()
+                    return
+
+        if added is not None:
+            self.__bounds = [widen_bounds(bound, (value, value))
+                             for bound, value in zip(bounds, added)]
+            self.__bounds += bounds[len(added):]
+            if self.parent is not None:
+                self.parent.update_bounds(self.__bounds)
+
 
     def to_list(self):
         """
@@ -626,6 +717,777 @@ class Group(object):
         return len(self.data_list)
 
 
+def widen_bounds(bounds, other):
+    """
+        Returns (min, max) bounds including both bounds and other, either
+        of which can be None (no values). Undefined (nan) values in other
+        are ignored.
+
+        Usage:
+        >>> widen_bounds((0, 1), (-2, 0.5)), widen_bounds(None, (3, 3))
+        ((-2, 1), (3, 3))
+    """
+    if other is None or other[0] != other[0] or other[1] != other[1]:
+        return bounds
+    if bounds is None:
+        return tuple(other)
+    return (min(bounds[0], other[0]), max(bounds[1], other[1]))
+
+def column_bounds(column):
+    """
+        Returns (min, max) of the numbers in column (a sequence), skipping
+        undefined (nan) values, or None if it has no numbers. Uses the
+        builtin min and max, so only their result is checked for nan.
+
+        Usage:
+        >>> nan = float('nan'); column_bounds([nan, 3, nan, -1])
+        (-1, 3)
+        >>> column_bounds([nan]), column_bounds([])
+        (None, None)
+    """
+    if len(column) == 0:
+        return None
+    low = min(column)
+    high = max(column)
+    if low != low or high != high:
+        # min and max only skip nan after a number
+        column = [value for value in column if value == value]
+        if not column:
+            return None
+        low = min(column)
+        high = max(column)
+    return (low, high)
+
+class _WindowBounds(object):
+    """
+        (min, max) of a column that values are appended to and dropped
+        from the start of (a sliding window), kept in constant time on
+        average: each value is added and dropped at most once from two
+        queues, of the values that can still become the min or max.
+    """
+    def __init__(self):
+        """
+            Starts with no values.
+
+            Usage:
+            >>> w = _WindowBounds()
+            >>> for index, value in enumerate([3, 1, 4, 1, 5]): w.add(index, value)
+            >>> w.get_bounds()
+            (1, 5)
+            >>> w.drop(0); w.drop(1); w.drop(2); w.get_bounds()
+            (1, 5)
+            >>> w.drop(3); w.get_bounds()
+            (5, 5)
+        """
+        # (index, value) of the values that can become the min (max)
+        self.lows = deque()
+        self.highs = deque()
+
+    def add(self, index, value):
+        """
+            Adds value, at an index larger than the others. Undefined
+            (nan) values are skipped.
+        """
+        if value != value:
+            return
+        lows = self.lows
+        while lows and lows[-1][1] >= value:
+            lows.pop()
+        lows.append((index, value))
+        highs = self.highs
+        while highs and highs[-1][1] <= value:
+            highs.pop()
+        highs.append((index, value))
+
+    def drop(self, index):
+        """
+            Drops the value at index, the smallest index kept.
+        """
+        if self.lows and self.lows[0][0] == index:
+            self.lows.popleft()
+        if self.highs and self.highs[0][0] == index:
+            self.highs.popleft()
+
+    def get_bounds(self):
+        """
+            Returns (min, max) of the values, or None if there are none
+        """
+        if not self.lows:
+            return None
+        return (self.lows[0][1], self.highs[0][1])
+
+def is_buffer(data):
+    """
+        Returns True if data is an array or buffer of numbers (used by
+        ArrayGroup without copying): an array.array, mmap, buffer,
+        BufferColumn or an object with the numpy array interface.
+        Strings aren't buffers.
+
+        Usage:
+        >>> is_buffer(array('d', [1, 2])), is_buffer([1, 2]), is_buffer('ab')
+        (True, False, False)
+    """
+    return (isinstance(data, BUFFERTYPES + (BufferColumn,)) or
+            hasattr(data, '__array_interface__'))
+
+def is_buffer_columns(data):
+    """
+        Returns True if data is a list or tuple of 2 or 3 buffers
+        (coordinate lists as buffers, see is_buffer).
+    """
+    if type(data) not in LISTTYPES or len(data) not in (2, 3):
+        return False
+    for column in data:
+        if not is_buffer(column):
+            return False
+    return True
+
+
+class BufferColumn(object):
+    """
+        Read-only sequence of numbers stored in a buffer (like an mmap of
+        a binary file), read when needed instead of copied.
+
+        Values have a struct format (default 'd', a native double) and
+        are every stride bytes starting at offset, so interleaved records
+        can be read one column at a time. They are read as floats.
+    """
+    def __init__(self, data, format='d', offset=0, stride=None, count=None):
+        """
+            Creates column for data (anything supporting the buffer
+            protocol).
+
+            Usage:
+            >>> c = BufferColumn(array('d', [1, 2, 3, 4]), stride=16); c.tolist()
+            [1.0, 3.0]
+            >>> c = BufferColumn(array('d', [1, 2, 3, 4]), offset=8, stride=16); c[-1], len(c)
+            (4.0, 2)
+        """
+        self.data = data
+        self.buffer = buffer(data)
+        self.format = format
+        self.itemsize = struct.calcsize(format)
+        self.offset = offset
+        self.stride = stride or self.itemsize
+        if count is None:
+            count = max(0, (len(self.buffer) - offset - self.itemsize) // self.stride + 1)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        """
+            Returns number at key (or a list of numbers for a slice)
+        """
+        if type(key) is slice:
+            return [self[position] for position in xrange(*key.indices(self.count))]
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError, "BufferColumn index out of range"
+        return float(struct.unpack_from(self.format, self.buffer,
+                                        self.offset + key*self.stride)[0])
+
+    def __iter__(self):
+        """
+            Iterates over all numbers, unpacking many at a time
+        """
+        if self.stride != self.itemsize:
+            for position in xrange(self.count):
+                yield self[position]
+            return
+
+        # contiguous values are unpacked in chunks
+        chunk = 4096
+        for start in xrange(0, self.count, chunk):
+            size = min(chunk, self.count - start)
+            values = struct.unpack_from(self._chunkformat(size), self.buffer,
+                                        self.offset + start*self.stride)
+            for value in values:
+                yield float(value)
+
+    def _chunkformat(self, size):
+        """
+            Returns struct format for size values
+        """
+        if self.format[0] in '@=<>!':
+            return self.format[0] + str(size) + self.format[1:]
+        return str(size) + self.format
+
+    def tolist(self):
+        """
+            Returns list of all numbers
+        """
+        return list(self)
+
+
+def _interface_format(typestr):
+    """
+        Returns struct format for a numpy array interface typestr
+        (like '<f8').
+    """
+    order = typestr[0]
+    if order == '|':
+        order = '='
+    kind = typestr[1]
+    size = int(typestr[2:])
+    codes = {'f': {4: 'f', 8: 'd'},
+             'i': {1: 'b', 2: 'h', 4: 'i', 8: 'q'},
+             'u': {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}}
+    if kind not in codes or size not in codes[kind]:
+        raise TypeError, "Arrays of %s can't be plotted" % typestr
+    return order + codes[kind][size]
+
+def buffer_columns(data):
+    """
+        Returns list of columns (arrays or BufferColumns) for data, a
+        buffer (see is_buffer) holding numbers, or a list of buffers
+        holding coordinates. Nothing is copied.
+
+        Two dimensional numpy arrays are read like lists: 2 or 3 rows
+        are coordinates, otherwise rows of 2 or 3 items are points.
+    """
+    if type(data) in LISTTYPES:
+        columns = []
+        for column in data:
+            columns.extend(buffer_columns(column))
+        return columns
+
+    if isinstance(data, BufferColumn):
+        return [data]
+
+    if not hasattr(data, '__array_interface__'):
+        # arrays of doubles are used directly (and can be changed)
+        if isinstance(data, array) and data.typecode == 'd':
+            return [data]
+        if isinstance(data, array):
+            return [BufferColumn(data, data.typecode)]
+        return [BufferColumn(data)]
+
+    interface = data.__array_interface__
+    format = _interface_format(interface['typestr'])
+    itemsize = struct.calcsize(format)
+    shape = interface['shape']
+    strides = interface.get('strides')
+    if strides is None:
+        # contiguous (C order)
+        strides = (itemsize,)
+        if len(shape) == 2:
+            strides = (shape[1]*itemsize, itemsize)
+    if len(shape) == 1:
+        return [BufferColumn(data, format, 0, strides[0], shape[0])]
+    if len(shape) == 2 and shape[0] in (2, 3):
+        return [BufferColumn(data, format, row*strides[0], strides[1], shape[1])
+                for row in range(shape[0])]
+    if len(shape) == 2 and shape[1] in (2, 3):
+        return [BufferColumn(data, format, column*strides[1], strides[0], shape[0])
+                for column in range(shape[1])]
+    raise TypeError, "Arrays must have one dimension, or 2 or 3 rows or columns"
+
+
+class ArrayData(Data):
+    """
+        Data of an ArrayGroup. It holds no values itself: content reads
+        and writes the group's arrays at the data's position.
+    """
+    def __init__(self, group, position):
+        """
+            Creates data for item position of group.
+
+            Usage:
+            >>> g = ArrayGroup([(1,2),(3,4)]); d = g[1]; print d
+            (3.0, 4.0)
+            >>> d.content = (5,6); print g
+            ['(1.0, 2.0)', '(5.0, 6.0)']
+        """
+        self.parent = group
+        self.position = position
+
+    # Name property
+    @apply
+    def name():
+        doc = """
+            Name of the data, stored by the group.
+        """
+        def fget(self):
+            """
+                returns the name as a string
+            """
+            return self.parent.get_name(self.position)
+
+        def fset(self, name):
+            """
+                Sets the name of the Data
+            """
+            self.parent.set_name(self.position, name)
+
+        return property(**locals())
+
+    # Content property
+    @apply
+    def content():
+        doc = """
+            Content is a read/write property for the group's values at
+            this data's position.
+        """
+        def fget(self):
+            """
+                Return the content of Data
+            """
+            return self.parent.get_content(self.position)
+
+        def fset(self, data):
+            """
+                Stores data in the group's arrays
+            """
+            self.parent.set_content(self.position, data)
+
+        return property(**locals())
+
+
+class ArrayGroup(Group):
+    """
+        Group that stores its data in arrays of floats, one for each
+        coordinate (x, y and optionally z), instead of a list of Data.
+        Names are kept separately, only for data that have them.
+
+        This uses a fraction of the memory of Group, and is much faster
+        to create from lists of coordinates. Buffers (mmaps, numpy arrays,
+        see buffer_columns) are read without copying them. Arrays of
+        doubles are copied, unless share is True: then the group uses
+        (and changes) the arrays passed in.
+
+        Indexing and iterating give ArrayData objects, which behave like
+        Data (but read and write the arrays). Values are stored as floats.
+        Arrays changed directly (like shared ones) need invalidate, so
+        bounds are calculated again. Buffers are read-only: they're copied
+        into arrays the first time the group is changed.
+
+        With a capacity, append works like a ring buffer: dropped data is
+        skipped (start) and only removed from the arrays once as much as
+        the capacity was dropped.
+    """
+    def __init__(self, group=None, name=None, parent=None, share=False):
+        """
+            Starts main atributes in ArrayGroup instance (see Group).
+            With share, arrays of doubles in group are used as the
+            group's arrays instead of copies.
+
+            Usage:
+            >>> g = ArrayGroup([1,2,3], 'numbers'); print g
+            numbers ['1.0', '2.0', '3.0']
+            >>> g = ArrayGroup([(1,2),(2,3)], 'points'); print g
+            points ['(1.0, 2.0)', '(2.0, 3.0)']
+            >>> g = ArrayGroup([[1,2,3],[4,5,6]], 'coordinates'); print g
+            coordinates ['(1.0, 4.0)', '(2.0, 5.0)', '(3.0, 6.0)']
+            >>> g = ArrayGroup([[1,2],[3,4],[5,6]]); print g
+            ['(1.0, 3.0, 5.0)', '(2.0, 4.0, 6.0)']
+            >>> g[0].content, g[-1].content, len(g)
+            ((1.0, 3.0, 5.0), (2.0, 4.0, 6.0), 2)
+            >>> x = array('d', [1,2]); g = ArrayGroup([x, x]); g.append((3,3)); x
+            0
+            array('d', [1.0, 2.0])
+            >>> g = ArrayGroup([x, array('d', x)], share=True); g.append((3,3)); x
+            0
+            array('d', [1.0, 2.0, 3.0])
+        """
+        # one array per coordinate (or just one for numbers), arrays
+        # passed in are used directly with share
+        self.columns = []
+        self.names = {}
+        self.share = share
+
+        # most data kept by append (None for no limit), where the kept
+        # data starts in the arrays and how much was dropped in all
+        self.capacity = None
+        self.start = 0
+        self.dropped = 0
+
+        # bounds of each array while appending with a capacity (None
+        # when they are calculated from all the data, see get_bounds)
+        self.window = None
+
+        Group.__init__(self, group, name, parent)
+
+    # data_list property
+    @apply
+    def data_list():
+        doc = """
+            The data_list is a read/write property that accepts the same
+            values as Group's, and also lists of arrays (coordinates).
+            Reading it returns the group itself, which is a sequence of
+            ArrayData.
+
+            Usage:
+            >>> g = ArrayGroup(); g.data_list = 13; print g
+            ['13.0']
+            >>> g.data_list = (1,2); print g
+            ['(1.0, 2.0)']
+            >>> x = array('d', [1,2]); g.data_list = [x, array('i', [3,4])]; print g
+            ['(1.0, 3.0)', '(2.0, 4.0)']
+            >>> x[1] = 5; print g
+            ['(1.0, 3.0)', '(2.0, 4.0)']
+            >>> g.share = True; g.data_list = [x, array('i', [3,4])]
+            >>> x[1] = 6; print g
+            ['(1.0, 3.0)', '(6.0, 4.0)']
+            >>> g.range = 3; g.data_list = lambda x:x**2; print g
+            ['(0.0, 0.0)', '(1.0, 1.0)', '(2.0, 4.0)']
+        """
+        def fget(self):
+            """
+                Returns the group (a sequence of its data)
+            """
+            return self
+
+        def fset(self, group):
+            """
+                Ensures that group is valid.
+            """
+            self.invalidate()
+            self.columns = []
+            self.names = {}
+            self.start = 0
+
+            # None
+            if group is None:
+                return
+
+            # Buffers (read without copying, arrays are copied unless
+            # they're shared)
+            elif is_buffer(group) or is_buffer_columns(group):
+                self.columns = buffer_columns(group)
+                if not self.share:
+                    self.columns = [isinstance(column, array) and
+                                    array('d', column) or column
+                                    for column in self.columns]
+                if len(set(len(column) for column in self.columns)) != 1:
+                    raise TypeError, "Coordinate lists must have the same length"
+
+            # Int/float/long, instance of Data or one point
+            elif (type(group) in NUMTYPES or isinstance(group, Data) or
+                  (type(group) is tuple and len(group) in (2,3))):
+                self.add_data(group)
+
+            # Coordinate lists
+            elif (type(group) in LISTTYPES and len(group) > 0 and
+                  type(group[0]) in (list, array)):
+                if len(group) not in (2, 3):
+                    raise TypeError, "Only one list of coordinates was received."
+                self.columns = [array('d', column) for column in group]
+                if len(set(len(column) for column in self.columns)) != 1:
+                    raise TypeError, "Coordinate lists must have the same length"
+
+            # list of items (or another group)
+            elif type(group) in LISTTYPES or isinstance(group, Group):
+                for item in group:
+                    self.add_data(item)
+
+            # function lambda
+            elif callable(group):
+                x_range = self.range
+                if len(x_range) == 0 and self.parent is not None:
+                    x_range = self.parent.range[:]
+                    self.range = x_range
+                if len(x_range) == 0:
+                    raise Exception, "Data argument is valid but to use function type please set x_range first"
+                self.columns = [array('d', x_range),
+                                array('d', map(group, x_range))]
+
+            else:
+                raise TypeError, "Group type not supported"
+
+        return property(**locals())
+
+    def add_data(self, data, name=None):
+        """
+            Append a new data to the arrays.
+             - If data is an instance of Data, append its content (and name)
+             - If it's an int, float, tuple or list append it
+
+            All data must have the same number of coordinates.
+
+            Usage:
+            >>> g = ArrayGroup()
+            >>> g.add_data((1,1),'a'); g.add_data((2,2)); print g
+            ['a: (1.0, 1.0)', '(2.0, 2.0)']
+            >>> g.add_data(Data((1,2),'c')); print g
+            ['a: (1.0, 1.0)', '(2.0, 2.0)', 'c: (1.0, 2.0)']
+            >>> g.add_data(3)
+            Traceback (most recent call last):
+            ...
+            TypeError: Data must have 2 items, like the rest of the group
+        """
+        if isinstance(data, Data):
+            name = data.name
+            data = data.content
+        elif type(data) is list:
+            data = tuple(data)
+        if data is None:
+            return
+
+        values = data
+        if type(data) in NUMTYPES:
+            values = (data,)
+        elif type(data) is not tuple or len(data) not in (2, 3):
+            raise TypeError, "Data must be an int, float or a tuple with two or three items"
+
+        self.invalidate()
+        if not self.columns:
+            self.columns = [array('d') for value in values]
+        elif len(values) != len(self.columns):
+            raise TypeError, "Data must have %d items, like the rest of the group" % len(self.columns)
+        self.own_columns()
+
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        if type(name) in STRTYPES and len(name) > 0:
+            self.names[len(self) - 1] = name
+
+    def append(self, data):
+        """
+            Adds data (a number or point) at the end, like add_data, but if
+            the group has a capacity and is full, its oldest data is
+            removed (like a ring buffer). Bounds are updated without
+            going through all the data, so they are those of the data
+            kept.
+
+            Returns the number of data removed.
+
+            Usage:
+            >>> g = ArrayGroup([(0,1),(1,5)]); g.capacity = 2; g.get_bounds()
+            [(0.0, 1.0), (1.0, 5.0), None]
+            >>> g.append((2,3)), g.get_bounds()
+            (1, [(1.0, 2.0), (3.0, 5.0), None])
+            >>> g.append((3,4)), g.get_bounds(), g[0].content, len(g)
+            (1, [(2.0, 3.0), (3.0, 4.0), None], (2.0, 3.0), 2)
+            >>> g = ArrayGroup([1,2]); g.capacity = 2
+            >>> [g.append(value) for value in (7,8,9)], g.get_bounds(), g.to_list()
+            ([1, 1, 1], [(0, 1), (8.0, 9.0), None], [8.0, 9.0])
+            >>> g = ArrayGroup(BufferColumn(array('d', [1, 2]))); g.capacity = 2
+            >>> g.append(3), g.to_list(), type(g.columns[0])
+            (1, [2.0, 3.0], <type 'array.array'>)
+        """
+        if type(data) is list:
+            data = tuple(data)
+        values = data
+        if type(data) in NUMTYPES:
+            values = (data,)
+        if not self.columns:
+            self.add_data(data)
+            return 0
+        if len(values) != len(self.columns):
+            raise TypeError, "Data must have %d items, like the rest of the group" % len(self.columns)
+        self.own_columns()
+
+        if self.capacity is None:
+            for column, value in zip(self.columns, values):
+                column.append(value)
+            self.update_bounds(added=data)
+            return 0
+
+        if self.window is None:
+            self.window = [_WindowBounds() for column in self.columns]
+            for position in xrange(len(self)):
+                for window, column in zip(self.window, self.columns):
+                    window.add(self.dropped + position, column[self.start + position])
+
+        removed = max(0, len(self) + 1 - self.capacity)
+        for position in xrange(removed):
+            for window in self.window:
+                window.drop(self.dropped)
+            self.dropped += 1
+        self.start += removed
+        if removed and self.names:
+            self.names = dict((position - removed, name)
+                              for position, name in self.names.items()
+                              if position >= removed)
+
+        index = self.dropped + len(self)
+        for window, column, value in zip(self.window, self.columns, values):
+            column.append(value)
+            window.add(index, column[-1])
+        if self.start >= self.capacity:
+            self.compact()
+        if self.parent is not None:
+            self.parent.invalidate()
+        return removed
+
+    def compact(self):
+        """
+            Removes the data dropped by append from the arrays.
+        """
+        if self.start:
+            self.own_columns()
+            for column in self.columns:
+                del column[:self.start]
+            self.start = 0
+
+    def own_columns(self):
+        """
+            Copies columns read from buffers (see BufferColumn, they're
+            read-only) into arrays, so they can be changed.
+
+            Usage:
+            >>> g = ArrayGroup(BufferColumn(array('d', [1, 2]))); g[1].content = 5; print g
+            ['1.0', '5.0']
+        """
+        for position, column in enumerate(self.columns):
+            if not isinstance(column, array):
+                self.columns[position] = array('d', column)
+
+    def get_bounds(self):
+        """
+            Returns the bounds of the group's data (see Group.get_bounds),
+            kept by append while it drops data.
+        """
+        if self.window is None:
+            return Group.get_bounds(self)
+        bounds = [window.get_bounds() for window in self.window]
+        if len(self.columns) == 1:
+            bounds.insert(0, len(self) and (0, len(self) - 1) or None)
+        return (bounds + [None, None, None])[:3]
+
+    def invalidate(self):
+        """
+            Forgets the group's bounds (see Group.invalidate), including
+            those kept by append.
+        """
+        if self.window is not None:
+            self.window = None
+            if self.parent is not None:
+                self.parent.invalidate()
+        Group.invalidate(self)
+
+    def get_content(self, position):
+        """
+            Returns the content of data at position (a number or a tuple)
+        """
+        position += self.start
+        if len(self.columns) == 1:
+            return self.columns[0][position]
+        return tuple([column[position] for column in self.columns])
+
+    def set_content(self, position, data):
+        """
+            Changes the content of data at position (with the same number
+            of items, see add_index to turn numbers into points).
+        """
+        if type(data) in NUMTYPES:
+            data = (data,)
+        if len(data) != len(self.columns):
+            raise TypeError, "Data must have %d items, like the rest of the group" % len(self.columns)
+
+        self.invalidate()
+        self.own_columns()
+        for column, value in zip(self.columns, data):
+            column[self.start + position] = value
+
+    def add_index(self, start=0, step=1):
+        """
+            Turns numbers into points, with x coordinates from start
+            every step (like when numbers are plotted by index).
+
+            Usage:
+            >>> g = ArrayGroup([5,6]); g.add_index(); print g
+            ['(0.0, 5.0)', '(1.0, 6.0)']
+        """
+        if len(self.columns) != 1:
+            raise TypeError, "Only a group of numbers can be indexed"
+        self.compact()
+        x = array('d', [start + step*position for position in xrange(len(self))])
+        self.invalidate()
+        self.columns.insert(0, x)
+
+    def get_name(self, position):
+        """
+            Returns the name of data at position (or None)
+        """
+        return self.names.get(position)
+
+    def set_name(self, position, name):
+        """
+            Sets the name of data at position (None or '' remove it)
+        """
+        if type(name) in STRTYPES and len(name) > 0:
+            self.names[position] = name
+        else:
+            self.names.pop(position, None)
+
+    def to_list(self):
+        """
+            Returns the group as a list of numbers or a list of tuples.
+
+            Usage:
+            >>> ArrayGroup([1,2]).to_list()
+            [1.0, 2.0]
+            >>> ArrayGroup([(1,2),(3,4)]).to_list()
+            [(1.0, 2.0), (3.0, 4.0)]
+        """
+        self.compact()
+        if len(self.columns) == 1:
+            return self.columns[0].tolist()
+        return zip(*self.columns)
+
+    def get_columns(self):
+        """
+            Returns a list of the group's arrays (numbers get their index
+            as x). Changing them directly needs invalidate afterwards.
+        """
+        self.compact()
+        if len(self.columns) == 1:
+            return [xrange(len(self)), self.columns[0]]
+        return list(self.columns)
+
+    def copy(self):
+        """
+            Returns a copy of this group (with its own arrays, even if
+            this one shares them or reads a buffer)
+        """
+        new_group = ArrayGroup(name=self.name)
+        if self.range:
+            new_group.range = self.range[:]
+        new_group.columns = [array('d', column[self.start:])
+                             for column in self.columns]
+        new_group.names = self.names.copy()
+        return new_group
+
+    def get_names(self):
+        """
+            Return a list with the names of all data in this group
+        """
+        return [self.names.get(position, 'Data '+str(position+1))
+                for position in xrange(len(self))]
+
+    def __getitem__(self, key):
+        """
+            Returns ArrayData at key (or a list of them for a slice)
+        """
+        if type(key) is slice:
+            return [ArrayData(self, position)
+                    for position in xrange(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError, "ArrayGroup index out of range"
+        return ArrayData(self, key)
+
+    def __iter__(self):
+        """
+            Iterates over ArrayData for all positions
+        """
+        for position in xrange(len(self)):
+            yield ArrayData(self, position)
+
+    def __len__(self):
+        """
+            Returns the number of data in the group
+        """
+        if not self.columns:
+            return 0
+        return len(self.columns[0]) - self.start
+
+
 class Colors(object):
     """
         Class that models the colors its labels (names) and its properties, RGB
@@ -763,6 +1625,7 @@ class Series(object):
         self.__group_list = []
         self.__name = None
         self.__range = None
+        self.__bounds = None
 
         # TODO: Implement colors with filling
         self.__colors = None
@@ -947,9 +1810,13 @@ class Series(object):
                processed as coordinated lists and the result will be converted
                to a group of points;
              - a list of lambdas, each lambda represents a Group;
+             - an array or buffer (like an mmap or numpy array, see
+               is_buffer), or a list of them, each is converted to an
+               ArrayGroup (a list with a list of buffers is coordinated
+               lists);
              - a Dictionary where each item can be the same of the list: number,
                point, list of numbers, list of points, list of lists
-               (coordinated lists) or lambdas
+               (coordinated lists), lambdas or buffers
              - an instance of Data;
              - an instance of group.
 
@@ -985,6 +1852,10 @@ class Series(object):
             ["Group 1 ['d1: 1']"]
             >>> s.group_list = Group([(1,2),(2,3)],'g1'); print s
             ["g1 ['(1, 2)', '(2, 3)']"]
+            >>> s.group_list = [array('d', [1,2]), array('d', [3])]; print s
+            ["Group 1 ['1.0', '2.0']", "Group 2 ['3.0']"]
+            >>> s.group_list = {'g1':[array('d', [1,2]), array('d', [3,4])]}; print s
+            ["g1 ['(1.0, 3.0)', '(2.0, 4.0)']"]
         """
         def fget(self):
             """
@@ -996,6 +1867,7 @@ class Series(object):
             """
                 Controls the input of a valid group list.
             """
+            self.invalidate()
             #TODO: Add support to the following strem of data: [ (0.5,5.5) , [(0,4),(6,8)] , (5.5,7) , (7,9)]
 
             # Type: None
@@ -1008,7 +1880,8 @@ class Series(object):
 
                 is_function = lambda x: callable(x)
                 # Groups
-                if list in map(type, series) or max(map(is_function, series)):
+                if (list in map(type, series) or max(map(is_function, series)) or
+                    max(map(is_buffer, series))):
                     for group in series:
                         self.add_group(group)
 
@@ -1033,10 +1906,10 @@ class Series(object):
                 names = series.keys()
                 names.sort()
                 for name in names:
-                    self.add_group(Group(series[name],name,self))
+                    self.add_group(series[name], name)
 
-            # A single lambda
-            elif callable(series):
+            # A single lambda or buffer
+            elif callable(series) or is_buffer(series):
                 self.__group_list = []
                 self.add_group(series)
 
@@ -1055,7 +1928,9 @@ class Series(object):
         """
             Append a new group in group_list
         """
-        if not isinstance(group, Group):
+        if is_buffer(group) or is_buffer_columns(group):
+            group = ArrayGroup(group, name, self)
+        elif not isinstance(group, Group):
             #Try to convert
             group = Group(group, name, self)
 
@@ -1064,9 +1939,52 @@ class Series(object):
             if group.name is None:
                 group.name = "Group "+str(len(self.__group_list)+1)
 
+            self.invalidate()
             self.__group_list.append(group)
             self.__group_list[-1].parent = self
 
+    def get_bounds(self):
+        """
+            Returns a list with the (min, max) of each coordinate (x, y and
+            z) of all groups, or None for missing coordinates (see
+            Group.get_bounds). The bounds are kept until a group changes.
+
+            Usage:
+            >>> s = Series([[(1,2),(3,4)], [(0,5,1)]]); s.get_bounds()
+            [(0, 3), (2, 5), (1, 1)]
+            >>> s[1][0].content = (9,9,9); s.get_bounds()
+            [(1, 9), (2, 9), (9, 9)]
+        """
+        if self.__bounds is None:
+            bounds = [None, None, None]
+            for group in self:
+                for index, group_bounds in enumerate(group.get_bounds()):
+                    if group_bounds is None:
+                        continue
+                    if bounds[index] is None:
+                        bounds[index] = group_bounds
+                    else:
+                        bounds[index] = (min(bounds[index][0], group_bounds[0]),
+                                         max(bounds[index][1], group_bounds[1]))
+            self.__bounds = bounds
+        return list(self.__bounds)
+
+    def invalidate(self):
+        """
+            Forgets the series' bounds (called by its groups when they
+            change).
+        """
+        self.__bounds = None
+
+    def update_bounds(self, bounds):
+        """
+            Widens the kept bounds to include a group's new bounds (see
+            Group.update_bounds).
+        """
+        if self.__bounds is not None:
+            self.__bounds = [widen_bounds(*pair)
+                             for pair in zip(self.__bounds, bounds)]
+
     def copy(self):
         """
             Returns a copy of the Series
@@ -1106,7 +2024,7 @@ class Series(object):
                 if type(data.content) in NUMTYPES:
                     big_list.append(data.content)
                 else:
-                    big_list = big_list + list(data.content)
+                    big_list.extend(data.content)
         return big_list
 
     def __getitem__(self, key):
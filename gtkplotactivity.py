@@ -149,12 +149,14 @@ class Plotter(gtk.Window):
 
     def plot(self):
         """Draws a plot from points."""
-        if self.canvas is not None:
-            self.plot_vbox.remove(self.canvas)
 
-        self.canvas = plotter.plot.CairoPlotCanvas.fromapp(self)
-        self.canvas.show()
-        self.plot_vbox.pack_end(self.canvas, True, True)
+        # create canvas the first time, then just give it new plots
+        if self.canvas is None:
+            self.canvas = plotter.plot.CairoPlotCanvas()
+            self.canvas.show()
+            self.plot_vbox.pack_end(self.canvas, True, True)
+
+        self.canvas.update(self)
 
 
     def on_save(self, widget, data=None):
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""plotbatch: renders saved plots to image files without a display.
+
+Usage: plotbatch.py [options] FILE...
+
+Each FILE (written by the activity's save) is rendered to an image next
+to it, or in the directory given with --output. Files are rendered in
+one process (or split between --jobs processes), and gtk is never
+imported.
+"""
+
+import optparse
+import os.path
+import sys
+
+import cairoplot.batch
+from plotter.document import PlotDocument, DEFAULT_SIZE, DEFAULT_BUDGET
+
+# image types that cairoplot can write
+_FORMATS = ["png", "svg", "pdf", "ps"]
+
+
+def output_path(file_path, directory, format):
+    """Returns name of image for file_path (in directory, if not None)."""
+
+    name = os.path.splitext(file_path)[0] + "." + format
+    if directory is not None:
+        name = os.path.join(directory, os.path.basename(name))
+    return name
+
+
+def render_file(file_path, directory, format, width, height,
+                budget=DEFAULT_BUDGET):
+    """Renders a single file."""
+
+    document = PlotDocument.read(file_path)
+    document.render(output_path(file_path, directory, format), width, height,
+            budget)
+
+
+def render_files(file_paths, directory=None, format="png",
+                 width=DEFAULT_SIZE, height=DEFAULT_SIZE, processes=1,
+                 budget=DEFAULT_BUDGET):
+    """Renders each file, returning list of (file, error) for failures."""
+
+    jobs = [(render_file, (file_path, directory, format, width, height,
+                           budget))
+            for file_path in file_paths]
+    results = cairoplot.batch.export(jobs, processes)
+    return [(result.job[1][0], result.error)
+            for result in results if result.error is not None]
+
+
+def main(argv):
+    """Runs plotbatch with command line arguments argv."""
+
+    parser = optparse.OptionParser(usage="%prog [options] FILE...")
+    parser.add_option("-f", "--format", choices=_FORMATS, default="png",
+            help="image type: %s (default png)" % ", ".join(_FORMATS))
+    parser.add_option("-o", "--output", metavar="DIR",
+            help="write images to DIR (default: next to each file)")
+    parser.add_option("-W", "--width", type="int", default=DEFAULT_SIZE,
+            help="image width (default %d)" % DEFAULT_SIZE)
+    parser.add_option("-H", "--height", type="int", default=DEFAULT_SIZE,
+            help="image height (default %d)" % DEFAULT_SIZE)
+    parser.add_option("-j", "--jobs", type="int", default=1,
+            help="number of processes to render with (0 for one per cpu)")
+    parser.add_option("-b", "--budget", type="float", default=DEFAULT_BUDGET,
+            help="seconds to spend evaluating the equations of each plot, "
+                 "the rest of their points are left out (0 for no limit, "
+                 "default %d)" % DEFAULT_BUDGET)
+    options, file_paths = parser.parse_args(argv[1:])
+    if not file_paths:
+        parser.error("no files to render")
+
+    failures = render_files(file_paths, options.output, options.format,
+            options.width, options.height, options.jobs or None,
+            options.budget or None)
+    for file_path, error in failures:
+        print >> sys.stderr, "%s: %s" % (file_path, error)
+    return len(failures) != 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,139 @@
+"""Plot documents (files written by Plotter.write_file) without gtk.
+
+This is used for rendering saved plots to image files, e.g. on a server
+with no display. Equations are read from the saved settings directly
+(see plotter.nodestrings), so neither the equation views nor the puzzle
+nodes (which load images with gtk) are imported.
+"""
+
+import codecs
+
+import cairoplot
+import cairoplot.sampling
+import plotter.json as json
+import plotter.nodestrings
+import plotter.parse
+import plotter.settings
+
+# newest versions understood (same as written by the views)
+_FILE_VERSION = 1
+_EQUATIONS_VERSION = 1
+_EQUATION_VERSION = 1
+_INPUT_VERSION = 1
+_NODE_VERSION = 1
+
+# default size of rendered plots (same as plotter.plot)
+DEFAULT_SIZE = 500
+
+# default seconds a rendered plot may spend evaluating its equations
+DEFAULT_BUDGET = 10
+
+
+class PlotDocument(object):
+    """Plot settings and equations loaded from a saved file."""
+
+    def __init__(self, settings, equations):
+        """Saves settings and equations (list of python equation strings)."""
+
+        self.settings = settings
+        self.equations = equations
+
+    @classmethod
+    def load(documentclass, settings):
+        """Loads document from dictionary written by Plotter.write_file.
+
+        Raises ValueError if settings are from a newer version,
+        or if an equation can't be converted to text.
+        """
+
+        if settings["version"] > _FILE_VERSION:
+            raise ValueError("unsupported file version %s"
+                    % settings["version"])
+
+        plotsettings = plotter.settings.PlotSettings.load(
+                settings["plot_config"])
+        equations = _load_equations(settings["equations"])
+        return documentclass(plotsettings, equations)
+
+    @classmethod
+    def read(documentclass, file_path):
+        """Loads document from a file."""
+
+        fp = codecs.open(file_path, "r", "utf-8")
+        try:
+            return documentclass.load(json.load(fp))
+        finally:
+            fp.close()
+
+
+    def get_functions(self):
+        """Returns list of functions for equations."""
+        return [plotter.parse.parse(e) for e in self.equations]
+
+
+    def render(self, filename, width=DEFAULT_SIZE, height=DEFAULT_SIZE,
+               budget=DEFAULT_BUDGET):
+        """Renders plot to filename (type from extension, as in cairoplot).
+
+        The plot looks the same as the one shown by plotter.plot.
+        Evaluating equations may take up to budget seconds (None for no
+        limit), after which the rest of their points are left out.
+        """
+
+        if budget is not None:
+            budget = cairoplot.sampling.Budget(budget)
+        plot = cairoplot.FunctionPlot(filename, data=self.get_functions(),
+                x_bounds=(self.settings.xmin, self.settings.xmax),
+                adaptive=True, resolution=1, width=width, height=height,
+                background="white", border=20, axis=True, grid=True,
+                budget=budget)
+        plot.render()
+        plot.commit()
+
+
+def _load_equations(settings):
+    """Returns list of equation strings from EquationList settings."""
+
+    if settings["version"] > _EQUATIONS_VERSION:
+        raise ValueError("unsupported equations version %s"
+                % settings["version"])
+
+    equations = []
+    for equation in settings["equations"]:
+        if equation["version"] > _EQUATION_VERSION:
+            raise ValueError("unsupported equation version %s"
+                    % equation["version"])
+        inputsettings = equation["settings"]
+        if inputsettings["version"] > _INPUT_VERSION:
+            raise ValueError("unsupported %s version %s"
+                    % (equation["class"], inputsettings["version"]))
+
+        if equation["class"] == "text":
+            equations.append(inputsettings["text"])
+        elif equation["class"] == "puzzle":
+            equations.append(
+                    node_equation_string(inputsettings["settings"], "x"))
+        else:
+            raise ValueError("unknown equation class %r" % equation["class"])
+    return equations
+
+
+def node_equation_string(settings, variable):
+    """Returns equation string for saved puzzle node settings.
+
+    Strings come from plotter.nodestrings, like those of the loaded
+    nodes. Raises ValueError if the tree isn't complete.
+    """
+
+    if settings is None:
+        raise ValueError("incomplete puzzle equation")
+    if settings["version"] > _NODE_VERSION:
+        raise ValueError("unsupported node version %s" % settings["version"])
+
+    def child(index, variable):
+        return node_equation_string(settings["children"][index], variable)
+    value = None
+    if settings["class"] == "constant":
+        value = settings["settings"]["value"]
+    return plotter.nodestrings.equation_string(settings["class"], child,
+            variable, value)
@@ -0,0 +1,68 @@
+"""Equation strings of puzzle nodes, without gtk.
+
+Puzzle nodes (see plotter.view.puzzletree.nodes) and saved node settings
+(see plotter.document) are both turned into equations here, so a saved
+plot gives the same equation as the puzzle it was made from.
+"""
+
+# equation strings of nodes without children, by node class
+_SIMPLE_NODES = {
+    "identity": "%(variable)s",
+    "absolutevalue": "abs(%(variable)s)",
+    "sine": "sin(%(variable)s)",
+    "pi": "pi",
+    "e": "e",
+}
+
+# operators of binary nodes, by node class
+OPERATORS = {
+    "addition": "+",
+    "multiplication": "*",
+    "exponentiation": "**",
+}
+
+
+def equation_string(nodeclass, child, variable, value=None):
+    """Returns equation string of a node of class nodeclass (its CLASS).
+
+    child(index, variable) returns the equation string of the node's
+    child at index, given variable; value is the value of a constant.
+    Raises ValueError if nodeclass isn't known.
+
+    >>> def child(index, variable):
+    ...     return ["x", "2"][index]
+    >>> equation_string("sine", child, "x")
+    'sin(x)'
+    >>> equation_string("exponentiation", child, "x")
+    '(x ** 2)'
+    >>> equation_string("composition", lambda index, variable:
+    ...     ["abs(%s)", "(%s + 1)"][index] % variable, "x")
+    'abs((x + 1))'
+    >>> equation_string("constant", child, "x", 0.1)
+    '0.1'
+    >>> equation_string("constant", child, "x", -2)
+    '(-2)'
+    """
+
+    if nodeclass in _SIMPLE_NODES:
+        return _SIMPLE_NODES[nodeclass] % {"variable": variable}
+    elif nodeclass in OPERATORS:
+        return "(%s %s %s)" % (child(0, variable), OPERATORS[nodeclass],
+                               child(1, variable))
+    elif nodeclass == "composition":
+        # result from right will be new variable in left
+        return child(0, child(1, variable))
+    elif nodeclass == "constant":
+        # repr keeps all digits (str rounds to 12), so folded constants
+        # like pi + e stay exact; negative values need parentheses (so
+        # x ** 2 composed with -2 isn't -2 ** 2)
+        text = repr(value)
+        if text.startswith("-"):
+            text = "(%s)" % text
+        return text
+    raise ValueError("unknown node class %r" % nodeclass)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -2,6 +2,14 @@
 import math
 import copy
 
+# equations run "from __future__ import division" with restricted
+# builtins, where modules can't be loaded from disk, so __future__ must
+# already be imported (gtk does this for the activity, but not for
+# headless rendering)
+import __future__
+
+import plotter.simplify
+
 
 # create list of "safe" methods to allow in equations
 _safe_dict = {
@@ -19,23 +27,200 @@ _math_funcs = ['ceil', 'floor',
 for symbol in _math_funcs:
     _safe_dict[symbol] = getattr(math, symbol)
 
+# math errors that mean a point is undefined (same as FunctionPlot)
+_EVALUATION_ERRORS = (ValueError, ZeroDivisionError, OverflowError)
+
+# how many compiled equations to remember
+_CACHE_SIZE = 128
+
+
+class _FunctionCache(object):
+    """Least recently used cache of compiled equations."""
+
+    def __init__(self, maxsize):
+        """Creates an empty cache holding at most maxsize functions."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._functions = {}
+        self._order = []
+
+
+    def get(self, key):
+        """Returns function stored for key (or None if not cached)."""
+
+        function = self._functions.get(key)
+        if function is None:
+            self.misses += 1
+            return None
+
+        # move key to the most recently used end
+        self.hits += 1
+        self._order.remove(key)
+        self._order.append(key)
+        return function
+
+
+    def add(self, key, function):
+        """Stores function for key, dropping the least recently used."""
+
+        if key not in self._functions:
+            self._order.append(key)
+            if len(self._order) > self.maxsize:
+                del self._functions[self._order.pop(0)]
+        self._functions[key] = function
+
+
+    def clear(self):
+        """Removes all functions and resets counters."""
+        self.hits = 0
+        self.misses = 0
+        self._functions = {}
+        self._order = []
+
+
+_cache = _FunctionCache(_CACHE_SIZE)
+
+
+def cache_info():
+    """Returns dictionary with hits, misses, size and maxsize of cache."""
+    return {
+        "hits": _cache.hits,
+        "misses": _cache.misses,
+        "size": len(_cache._order),
+        "maxsize": _cache.maxsize,
+    }
+
+
+def cache_clear():
+    """Forgets all compiled equations."""
+    _cache.clear()
 
-def parse(stringfunc):
-    """Returns a method corresponding to stringfunc."""
 
-    # create a function using user input as the return line
+def _normalize(stringfunc):
+    """Returns equation text used as a cache key."""
+    return " ".join(stringfunc.replace("^", "**").split())
+
+
+def _simplify(equation):
+    """Returns simplified equation (which uses names from _safe_dict).
+
+    Integers in powers are made floats first (see
+    plotter.simplify.float_powers).
+    """
+    return plotter.simplify.simplify(plotter.simplify.float_powers(equation),
+            _safe_dict)
+
+
+def parse(stringfunc, vectorized=False):
+    """Returns a method corresponding to stringfunc.
+
+    The method evaluates a single x value. It also has a vectorized
+    attribute: a method taking a sequence of x values and returning a
+    list of y values, where points that can't be evaluated are nan.
+    If vectorized is True, that method is returned instead. Its errors
+    can be counted (see cairoplot.sampling.evaluate): it takes a list
+    as second argument, whose first item it adds them to.
+
+    Compiled methods are cached by equation text, so parsing the same
+    equation again returns the same (stateless) method. Equations are
+    simplified before compiling (see plotter.simplify), and their
+    numbers are floats, so huge powers overflow instead of taking for
+    ever. To limit the time of slow equations, sample them with a
+    cairoplot.sampling.Budget.
+
+    Usage:
+    >>> parse("10 ** 9 << 2")(0), parse("(7 & 3) ** 2 << x")(1)
+    (4000000000, 18)
+    >>> errors = [0]; parse("x + 9 ** 9 ** 9", vectorized=True)([1, 2], errors)
+    [nan, nan]
+    >>> errors
+    [2]
+    """
+
+    equation = _normalize(stringfunc)
+    function = _cache.get(equation)
+    if function is None:
+        function = _compile(_simplify(equation))
+        _cache.add(equation, function)
+
+    if vectorized:
+        return function.vectorized
+    return function
+
+
+def parse_steps(steps, stringfunc, vectorized=False):
+    """Returns a method like parse, that first evaluates steps.
+
+    steps is a list of (name, equation) pairs, assigned in order, so
+    later steps and stringfunc can use the names of earlier ones (for
+    values used more than once). Names should start with an underscore,
+    so they can't hide x or math functions.
+    """
+
+    lines = ["%s = %s" % (name, _normalize(s)) for name, s in steps]
+    equation = _normalize(stringfunc)
+    # (equations never contain newlines, so keys can't match parse's)
+    key = "\n".join(lines + [equation])
+    function = _cache.get(key)
+    if function is None:
+        lines = ["%s = %s" % (name, _simplify(_normalize(s)))
+                 for name, s in steps]
+        function = _compile(_simplify(equation), lines)
+        _cache.add(key, function)
+
+    if vectorized:
+        return function.vectorized
+    return function
+
+
+def _compile(equation, lines=()):
+    """Compiles equation (already normalized) into a method.
+
+    lines are statements (already normalized) run before equation.
+    """
+
+    # create functions using user input as the return line
+    # (the vectorized one loops inside the compiled code, so we don't
+    #  pay for a python function call on every point)
     stringfunction = ("from __future__ import division\n"
         "del __builtins__['__import__']\n"
         "def plot(x):\n"
-        "    return %s"
-        % stringfunc.replace("^", "**"))
+        "%s"
+        "    return %s\n"
+        "def plotmany(xs, errors=None):\n"
+        "    ys = []\n"
+        "    append = ys.append\n"
+        "    failed = 0\n"
+        "    for x in xs:\n"
+        "        try:\n"
+        "%s"
+        "            append(%s)\n"
+        "        except _errors:\n"
+        "            append(_nan)\n"
+        "            failed += 1\n"
+        "    if errors is not None:\n"
+        "        errors[0] += failed\n"
+        "    return ys\n"
+        "plot.vectorized = plotmany\n"
+        % ("".join("    %s\n" % line for line in lines), equation,
+           "".join("            %s\n" % line for line in lines), equation))
     compiledfunction = compile(stringfunction, "<string>", "exec")
 
     # plot the method using "safe" globals and locals
     # http://lybniz2.sourceforge.net/safeeval.html
     # this should also be thread-safe (I think...)
     globalscopy = copy.deepcopy(_safe_dict)
+    globalscopy["_errors"] = _EVALUATION_ERRORS
+    globalscopy["_nan"] = float("nan")
     localscopy = {}
     exec compiledfunction in globalscopy, localscopy
-    return localscopy["plot"]
+    function = localscopy["plot"]
+    # (see cairoplot.sampling.evaluate)
+    function.counts_errors = True
+    return function
+
 
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
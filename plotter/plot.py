@@ -1,31 +1,223 @@
 """Methods for creating plot figures."""
 
+import threading
+import traceback
+
+import gobject
+
 import cairoplot
+import cairoplot.sampling
 from cairoplot.handlers.gtk import GTKHandler
 
+# points per pixel of the preview shown while a plot is sampled
+_PREVIEW_RESOLUTION = 0.125
+
+# seconds each plot may spend evaluating equations (the rest of their
+#  points are left out)
+_EVALUATION_SECONDS = 5
+
+# size and margin (in pixels) of the error shown when a plot fails
+_ERROR_FONT_SIZE = 14
+_ERROR_MARGIN = 6
+
+# plots are sampled in threads, which must run alongside the main loop
+gobject.threads_init()
+
+
+class Cancelled(Exception):
+    """Raised in a sampling thread when its plot has been replaced."""
+
+
+class _CancellableFunction(object):
+    """Function that stops its sampling thread once the plot is stale.
+
+    It compares equal to the function it wraps, so values of earlier
+    plots are still found in the sample cache. Only the thread that
+    created it is stopped.
+    """
+
+    def __init__(self, function, canvas, generation):
+        """Wraps function for the plot of canvas' update generation."""
+        self.function = function
+        self.canvas = canvas
+        self.generation = generation
+        self.thread = threading.currentThread()
+        if hasattr(function, "vectorized"):
+            self.vectorized = self._vectorized
+            self.counts_errors = getattr(function, "counts_errors", False)
+
+    def check(self):
+        """Raises Cancelled if a later update replaced this plot."""
+        if (self.canvas.generation != self.generation and
+            threading.currentThread() is self.thread):
+            raise Cancelled()
+
+    def __call__(self, x):
+        self.check()
+        return self.function(x)
+
+    def _vectorized(self, xs, *errors):
+        self.check()
+        return self.function.vectorized(xs, *errors)
+
+    def __hash__(self):
+        return hash(self.function)
+
+    def __eq__(self, other):
+        return self.function == getattr(other, "function", other)
+
+    def __ne__(self, other):
+        return not self == other
+
+
 class CairoPlotCanvas(GTKHandler):
     """GTK canvas displaying plots from."""
 
+    def __init__(self):
+        """Creates an empty canvas (use update to plot)."""
+        GTKHandler.__init__(self)
+
+        # samples are kept between plots, so only new x ranges are evaluated
+        self.sample_cache = cairoplot.sampling.SampleCache()
+
+        # number of the latest sampling (older sampling threads stop)
+        self.generation = 0
+
+        # functions and x bounds of the latest update, and the width
+        #  they were sampled for (None until the canvas has a size)
+        self.request = None
+        self.sampled_width = None
+
+        # exception that stopped the latest update (None if it didn't
+        #  fail), shown over the plot
+        self.error = None
+
+        # plots are sampled again for the new width (see resample)
+        self.connect("size_allocate", self.on_size_allocate)
+
     @staticmethod
     def fromapp(app):
         """Creates a CairoPlotCanvas from application."""
+        canvas = CairoPlotCanvas()
+        canvas.update(app)
+        return canvas
+
+    def on_expose_event(self, widget, event):
+        """Copies the plot to the window (see GTKHandler), and shows the
+        error of the latest update over it."""
+        GTKHandler.on_expose_event(self, widget, event)
+        if self.error is None:
+            return
+
+        context = widget.window.cairo_create()
+        context.set_font_size(_ERROR_FONT_SIZE)
+        text = "Can't plot: %s" % self.error
+        width, height = context.text_extents(text)[2:4]
+        context.set_source_rgba(1, 1, 1, 0.8)
+        context.rectangle(0, 0, width + 2 * _ERROR_MARGIN,
+                height + 2 * _ERROR_MARGIN)
+        context.fill()
+        context.set_source_rgb(0.8, 0, 0)
+        context.move_to(_ERROR_MARGIN, _ERROR_MARGIN + height)
+        context.show_text(text)
+
+    def get_evaluation_stats(self):
+        """Returns list of the cost of evaluating each of the plot's
+        functions (see cairoplot.sampling.EvaluationStats)."""
+        if self.plot is None:
+            return []
+        return self.plot.evaluation_stats
+
+    def update(self, app):
+        """Replaces the plot with one for the application's equations.
+
+        The equations are sampled in a thread, so the window keeps
+        responding: a coarse preview is displayed first, then the full
+        plot (see resample).
+        """
 
         # plotsettings = plotter.settings.PlotSettings.fromapp(self)
         xmin = app.xmin_spin.get_value()
         xmax = app.xmax_spin.get_value()
-        xstep = (xmax - xmin) / 100.0
-
-        canvas = CairoPlotCanvas()
 
         # get data (functions in a list)
         functions = app.get_functions()
 
-        # create plot
-        plot = cairoplot.FunctionPlot(canvas, data=functions,
-                x_bounds=(xmin, xmax), step=xstep,
-                width=500, height=500, background="white",
-                border=20, axis=True, grid=True)
-        canvas.plot = plot
+        self.request = (functions, (xmin, xmax))
+        self.resample(preview=True)
 
-        return canvas
+    def resample(self, preview=False):
+        """Samples the latest update's equations for the canvas' width, in
+        a thread (cancelling earlier ones), with a coarse preview first if
+        asked for.
+
+        Nothing is sampled until the canvas has been given a size: it is
+        sampled then, and again whenever its width changes (see
+        on_size_allocate). Plots are never sampled while rendering.
+        """
+        self.generation += 1
+        allocation = self.get_allocation()
+        if (self.request is None or
+            allocation.width <= 1 or allocation.height <= 1):
+            self.sampled_width = None
+            return
+
+        functions, x_bounds = self.request
+        self.sampled_width = allocation.width
+        worker = threading.Thread(target=self._sample, args=(self.generation,
+                functions, x_bounds, allocation.width, allocation.height,
+                preview))
+        worker.setDaemon(True)
+        worker.start()
+
+    def on_size_allocate(self, widget, allocation):
+        """Samples again if the width changed (the plot displayed until
+        then is scaled to it)."""
+        if allocation.width != self.sampled_width:
+            self.resample(preview=self.plot is None)
+
+    def _sample(self, generation, functions, x_bounds, width, height,
+                preview):
+        """Creates plots for sampling generation (in a sampling thread)."""
+
+        functions = [_CancellableFunction(function, self, generation)
+                     for function in functions]
+        resolutions = (1,)
+        if preview:
+            resolutions = (_PREVIEW_RESOLUTION, 1)
+        try:
+            for resolution in resolutions:
+                # create plot (sampling about resolution points per pixel
+                #  of width, placed where the curves bend)
+                plot = cairoplot.FunctionPlot(self, data=functions,
+                        x_bounds=x_bounds, adaptive=True,
+                        resolution=resolution,
+                        sample_cache=self.sample_cache,
+                        budget=cairoplot.sampling.Budget(_EVALUATION_SECONDS),
+                        record_stats=True, follow_width=False,
+                        width=width, height=height, background="white",
+                        border=20, axis=True, grid=True)
+                gobject.idle_add(self._show, generation, plot)
+        except Cancelled:
+            pass
+        except Exception, error:
+            # (like an equation that isn't valid python)
+            traceback.print_exc()
+            gobject.idle_add(self._fail, generation, error)
+
+    def _show(self, generation, plot):
+        """Displays plot, unless a later sampling replaced it."""
+        if generation == self.generation:
+            self.error = None
+            self.set_plot(plot)
+        return False
+
+    def _fail(self, generation, error):
+        """Keeps error of sampling generation, unless a later one replaced it.
 
+        The previous plot stays displayed, with the error over it.
+        """
+        if generation == self.generation:
+            self.error = error
+            self.queue_draw()
+        return False
@@ -0,0 +1,296 @@
+"""Algebraic simplification of equation text.
+
+Parts of an equation that don't depend on x are folded into numbers
+(like 2 * pi or sin(pi / 4)), and operations that do nothing (like
+x * 1 or x ** 1) are removed, so they aren't computed for every point.
+Only plain arithmetic and function calls are simplified; equations
+using anything else are left as they are.
+"""
+
+import operator
+import re
+
+try:
+    import ast
+except ImportError:
+    # python 2.5: equations aren't simplified
+    ast = None
+
+# math errors that mean a value is undefined (same as plotter.parse)
+_EVALUATION_ERRORS = (ValueError, ZeroDivisionError, OverflowError,
+        TypeError)
+
+if ast is not None:
+    # operators that can be folded, and how they are written
+    _BINARY_OPERATORS = {
+        ast.Add: (operator.add, "+"),
+        ast.Sub: (operator.sub, "-"),
+        ast.Mult: (operator.mul, "*"),
+        ast.Div: (operator.truediv, "/"),
+        ast.FloorDiv: (operator.floordiv, "//"),
+        ast.Mod: (operator.mod, "%"),
+        ast.Pow: (operator.pow, "**"),
+    }
+    _UNARY_OPERATORS = {
+        ast.USub: (operator.neg, "-"),
+        ast.UAdd: (operator.pos, "+"),
+    }
+
+    # operators that only work on integers
+    _INTEGER_OPERATORS = (ast.LShift, ast.RShift, ast.BitAnd, ast.BitOr,
+            ast.BitXor, ast.Invert)
+
+# integer literal (with its sign, which python 2 puts in the number)
+_INTEGER = re.compile(r"-?\s*(0[xXoObB]?[0-9a-fA-F]*|[1-9][0-9]*)[lL]?")
+
+
+def float_powers(equation):
+    """Returns equation with the integers that are operands of ** written
+    as floats.
+
+    Python computes powers of integers exactly, so 9 ** 9 ** 9 would
+    take for ever (even to compile, as constants are folded); with
+    floats it overflows at once, and the point is undefined. Powers
+    used where only integers work (by <<, &, ~ or as an index) are left
+    alone, and so are other integers. Without the ast module (python
+    2.5), equation is returned as it is.
+
+    Usage:
+    >>> print float_powers("9 ** 9 ** 9 + x ** -2")
+    9.0 ** 9.0 ** 9.0 + x ** -2.0
+    >>> print float_powers("10 ** 9 << 2"), float_powers("(7 & 3) ** 2")
+    10 ** 9 << 2 (7 & 3) ** 2.0
+    >>> print float_powers("[x, 2 ** 3][2 ** 0]")
+    [x, 2.0 ** 3.0][2 ** 0]
+    """
+
+    if ast is None:
+        return equation
+    try:
+        tree = ast.parse(equation, mode="eval").body
+    except SyntaxError:
+        # leave error for the compiler to report
+        return equation
+
+    numbers = []
+    _power_numbers(tree, False, numbers)
+    pieces = []
+    last = 0
+    for node in sorted(numbers, key=lambda node: node.col_offset):
+        match = _INTEGER.match(equation, node.col_offset)
+        if node.lineno != 1 or match is None or node.col_offset < last:
+            continue
+        try:
+            number = repr(float(node.n))
+        except OverflowError:
+            # too large for a float, but its powers are floats anyway
+            continue
+        pieces.append(equation[last:match.start()])
+        pieces.append(number)
+        last = match.end()
+    pieces.append(equation[last:])
+    return "".join(pieces)
+
+
+def _power_numbers(node, exact, numbers):
+    """Adds the integer Num nodes that are whole operands of ** at node
+    to numbers, unless the result must be an integer (exact).
+    """
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) and not exact:
+        for operand in (node.left, node.right):
+            if (isinstance(operand, ast.Num) and
+                isinstance(operand.n, (int, long))):
+                numbers.append(operand)
+    if isinstance(node, ast.Subscript):
+        _power_numbers(node.value, False, numbers)
+        _power_numbers(node.slice, True, numbers)
+        return
+    if isinstance(node, (ast.BinOp, ast.UnaryOp)):
+        # integer operators need integers, others keep what they get
+        exact = exact or isinstance(node.op, _INTEGER_OPERATORS)
+    elif not isinstance(node, (ast.Index, ast.Slice)):
+        exact = False
+    for child in ast.iter_child_nodes(node):
+        _power_numbers(child, exact, numbers)
+
+
+def simplify(equation, names):
+    """Returns simplified equation text.
+
+    names is a dictionary of the functions and constants (float values)
+    that equation can use, such as parse's safe globals.
+
+    Usage:
+    >>> import math
+    >>> names = {"log": math.log, "sin": math.sin, "pi": math.pi}
+    >>> print simplify("x * (2 * pi / 2) + 0", names)
+    (x * 3.141592653589793)
+    >>> print simplify("sin(pi / 2) * x ** 1", names)
+    x
+    >>> print simplify("0 * log(x) + x ** 0", names)
+    ((0 * log(x)) + (x ** 0))
+
+    Simplified equations have the same values, and are undefined at the
+    same points:
+    >>> def values(equation):
+    ...     function = eval("lambda x: " + equation, dict(names))
+    ...     result = []
+    ...     for x in (-1.0, 0.0, 0.5, 2.0):
+    ...         try:
+    ...             result.append(round(function(x), 12))
+    ...         except _EVALUATION_ERRORS:
+    ...             result.append(None)
+    ...     return result
+    >>> for equation in ("x * (2 * pi / 2) + 0", "sin(pi / 2) * x ** 1",
+    ...                  "0 * log(x)", "x ** 0", "1 / x ** 1"):
+    ...     print values(equation) == values(simplify(equation, names)),
+    ...     print values(equation)
+    True [-3.14159265359, 0.0, 1.570796326795, 6.28318530718]
+    True [-1.0, 0.0, 0.5, 2.0]
+    True [None, None, -0.0, 0.0]
+    True [1.0, 1.0, 1.0, 1.0]
+    True [-1.0, None, 2.0, 0.5]
+    """
+
+    if ast is None:
+        return equation
+    try:
+        tree = ast.parse(equation, mode="eval").body
+    except SyntaxError:
+        # leave error for the compiler to report
+        return equation
+    if not _supported(tree):
+        return equation
+    return _source(_simplify(tree, names))
+
+
+def _supported(node):
+    """Returns whether all of the expression at node can be simplified."""
+
+    if isinstance(node, ast.BinOp):
+        return (type(node.op) in _BINARY_OPERATORS and
+                _supported(node.left) and _supported(node.right))
+    if isinstance(node, ast.UnaryOp):
+        return type(node.op) in _UNARY_OPERATORS and _supported(node.operand)
+    if isinstance(node, ast.Call):
+        if (not isinstance(node.func, ast.Name) or node.keywords or
+            node.starargs is not None or node.kwargs is not None):
+            return False
+        for argument in node.args:
+            if not _supported(argument):
+                return False
+        return True
+    if isinstance(node, ast.Num):
+        return not isinstance(node.n, complex)
+    return isinstance(node, ast.Name)
+
+
+def _number(value):
+    """Returns Num node for value, or None if it can't be written."""
+
+    if isinstance(value, bool) or not isinstance(value, (int, long, float)):
+        return None
+    if value != value or value in (float("inf"), float("-inf")):
+        return None
+    return ast.Num(n=value)
+
+
+def _isnumber(node, value):
+    """Returns whether node is a number equal to value."""
+    return isinstance(node, ast.Num) and node.n == value
+
+
+def _simplify(node, names):
+    """Returns simplified version of the (supported) expression at node."""
+
+    if isinstance(node, ast.Name):
+        value = names.get(node.id)
+        if isinstance(value, float):
+            return _number(value) or node
+        return node
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _simplify(node.operand, names)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(operand, ast.Num):
+            return _number(-operand.n) or ast.UnaryOp(op=node.op,
+                    operand=operand)
+        return ast.UnaryOp(op=node.op, operand=operand)
+
+    if isinstance(node, ast.Call):
+        arguments = [_simplify(a, names) for a in node.args]
+        function = names.get(node.func.id)
+        folded = None
+        if callable(function) and _allnumbers(arguments):
+            folded = _evaluate(function, [a.n for a in arguments])
+        return folded or ast.Call(func=node.func, args=arguments,
+                keywords=[], starargs=None, kwargs=None)
+
+    if isinstance(node, ast.BinOp):
+        left = _simplify(node.left, names)
+        right = _simplify(node.right, names)
+        kind = type(node.op)
+
+        # fold numbers (as floats, so large powers can't take forever)
+        if _allnumbers([left, right]):
+            function = _BINARY_OPERATORS[kind][0]
+            folded = _evaluate(lambda a, b: function(float(a), float(b)),
+                    [left.n, right.n])
+            if folded is not None:
+                return folded
+
+        # remove operations that do nothing
+        if kind is ast.Add and _isnumber(left, 0):
+            return right
+        if kind in (ast.Add, ast.Sub) and _isnumber(right, 0):
+            return left
+        if kind is ast.Mult and _isnumber(left, 1):
+            return right
+        if kind in (ast.Mult, ast.Div, ast.Pow) and _isnumber(right, 1):
+            return left
+        return ast.BinOp(left=left, op=node.op, right=right)
+
+    return node
+
+
+def _allnumbers(nodes):
+    """Returns whether all nodes are numbers."""
+    for node in nodes:
+        if not isinstance(node, ast.Num):
+            return False
+    return True
+
+
+def _evaluate(function, arguments):
+    """Returns Num node for function(*arguments), or None if undefined."""
+    try:
+        return _number(function(*arguments))
+    except _EVALUATION_ERRORS:
+        return None
+
+
+def _source(node):
+    """Returns equation text for the (simplified) expression at node."""
+
+    if isinstance(node, ast.Num):
+        text = repr(node.n)
+        if node.n < 0:
+            text = "(%s)" % text
+        return text
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.UnaryOp):
+        return "(%s%s)" % (_UNARY_OPERATORS[type(node.op)][1],
+                _source(node.operand))
+    if isinstance(node, ast.Call):
+        return "%s(%s)" % (node.func.id,
+                ", ".join(_source(a) for a in node.args))
+    return "(%s %s %s)" % (_source(node.left),
+            _BINARY_OPERATORS[type(node.op)][1], _source(node.right))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
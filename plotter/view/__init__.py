@@ -10,6 +10,7 @@ from gettext import gettext as _
 
 from .equation import EquationInput as _EquationInput
 from .puzzletree import PuzzleInput as _PuzzleInput
+from .puzzletree.compiler import compile_many as _compile_many
 
 # just in case we break backward compatibility
 _FILE_VERSION = 1
@@ -43,6 +44,11 @@ class EquationList(gtk.HBox):
         self.pack_start(imagevbox, expand=False)
         addbutton.connect("clicked", self._on_add, None)
 
+        # finished puzzles compiled by get_model, and the inputs and
+        # versions they were compiled from
+        self._treestamp = None
+        self._treefunctions = None
+
         # created default equation input
         self._equations = []
         self._add_equation(_PuzzleInput(app))
@@ -102,11 +108,34 @@ class EquationList(gtk.HBox):
 
 
     def get_model(self):
-        """Returns a list of equations."""
+        """Returns a list of equations.
+
+        Finished puzzles are compiled together, so subtrees they have
+        in common are only evaluated once.
+        """
 
         equations = []
+        trees = []
+        treeindices = []
+        stamp = []
         for equation in self._equations:
-            equations.append(equation.get_model())
+            tree = None
+            if hasattr(equation, "get_tree"):
+                tree = equation.get_tree()
+            if tree is None:
+                equations.append(equation.get_model())
+            else:
+                treeindices.append(len(equations))
+                trees.append(tree)
+                stamp.append((equation, equation.get_version()))
+                equations.append(None)
+
+        # only compile again if a puzzle changed
+        if stamp != self._treestamp:
+            self._treefunctions = _compile_many(trees)
+            self._treestamp = stamp
+        for i, function in zip(treeindices, self._treefunctions):
+            equations[i] = function
         return equations
 
 
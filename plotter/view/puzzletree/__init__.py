@@ -5,6 +5,7 @@ import gtk
 from .display import PuzzleDisplay
 from .palette import PuzzlePalette
 from .nodes import Node
+from .simplify import simplify
 
 _FILE_VERSION = 1
 
@@ -104,7 +105,17 @@ class PuzzleInput(gtk.VBox):
         return self._display.get_model()
 
 
+    def get_tree(self):
+        """Returns root of the tree if it is finished, otherwise None."""
+        return self._display.get_tree()
+
+
+    def get_version(self):
+        """Returns number that changes whenever the tree changes."""
+        return self._display.version
+
+
     def get_equation_string(self):
-        """Returns a string representing the current equation."""
-        return Node.get_equation_string(self._display.rootnode, "x")
+        """Returns a string representing the current (simplified) equation."""
+        return Node.get_equation_string(simplify(self._display.rootnode), "x")
 
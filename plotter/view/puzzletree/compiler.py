@@ -0,0 +1,299 @@
+"""Compiles puzzle trees into python functions.
+
+Calling a tree of nodes costs a method call per node for every point,
+so finished trees are turned into a single function (see plotter.parse)
+built from the same equation strings as Node.get_equation_string.
+
+Trees are simplified first (see simplify), then equal subtrees
+(applied to the same variable) are only computed once:
+each distinct value gets an id, and values used more than once are
+assigned to temporaries. compile_many does the same across equations.
+"""
+
+import re
+import threading
+
+import plotter.nodestrings
+import plotter.parse
+
+from .nodes import Composition, Constant
+from .simplify import simplify
+
+# expressions that don't need a temporary when used more than once
+_SIMPLE = re.compile(r"^([A-Za-z_][A-Za-z_0-9]*|[0-9.]+([eE][-+]?[0-9]+)?)$")
+
+# placeholder for the variable when getting a node's equation string
+_VARIABLE = "\0"
+
+# fewest points evaluated for all of compile_many's equations at once
+# (fewer points, like refinements of adaptive sampling, are usually
+#  only needed by one equation)
+_SHARED_MINIMUM = 16
+
+# values of compile_many's equations kept (by point) for the functions
+# that haven't been evaluated at those points yet
+_SHARED_POINTS = 16384
+
+# compile_many results (by the trees' keys), so plotting the same
+# equations again gives the same functions (and SampleCache hits)
+_SHARED_CACHE_SIZE = 16
+_shared = {}
+
+
+class _Values(object):
+    """Distinct values computed by trees, and how they are computed."""
+
+    def __init__(self):
+        """Starts with just the variable x (id 0)."""
+        self.ids = {}
+        self.templates = ["x"]
+        self.arguments = [()]
+        self.uses = [0]
+
+
+    def add(self, node, variable=0):
+        """Returns id of node's value given variable's id.
+
+        Raises ValueError if the tree has empty children.
+        """
+
+        if node is None:
+            raise ValueError("tree is not complete")
+
+        # composition: right's value is left's variable
+        if isinstance(node, Composition):
+            return self.add(node.children[0], self.add(node.children[1],
+                    variable))
+
+        operator = plotter.nodestrings.OPERATORS.get(node.CLASS)
+        if isinstance(node, Constant):
+            template = node.get_equation_string(_VARIABLE).replace("%", "%%")
+            arguments = ()
+        elif operator is not None:
+            template = "(%%s %s %%s)" % operator
+            arguments = (self.add(node.children[0], variable),
+                         self.add(node.children[1], variable))
+        else:
+            text = node.get_equation_string(_VARIABLE)
+            if text == _VARIABLE:
+                # identity
+                return variable
+            template = text.replace("%", "%%").replace(_VARIABLE, "%s")
+            arguments = (variable,) * text.count(_VARIABLE)
+
+        key = (template, arguments)
+        if key not in self.ids:
+            self.ids[key] = len(self.templates)
+            self.templates.append(template)
+            self.arguments.append(arguments)
+            self.uses.append(0)
+            for argument in arguments:
+                self.uses[argument] += 1
+        return self.ids[key]
+
+
+    def equations(self, roots):
+        """Returns (steps, equations) for parse_steps, for values roots."""
+
+        steps = []
+        names = {}
+
+        def equation(value):
+            if value in names:
+                return names[value]
+            text = self.templates[value] % tuple(
+                    equation(a) for a in self.arguments[value])
+            if self.uses[value] > 1 and _SIMPLE.match(text) is None:
+                name = "_t%d" % len(steps)
+                steps.append((name, text))
+                names[value] = text = name
+            return text
+
+        for root in roots:
+            self.uses[root] += 1
+        return steps, [equation(root) for root in roots]
+
+
+def compile_tree(node, vectorized=False):
+    """Returns function evaluating the tree at node (like node(x)).
+
+    The function has a vectorized attribute, as returned by parse.
+    Raises ValueError if the tree has empty children.
+
+    Usage:
+    >>> from .nodes import (Addition, Multiplication, Exponentiation,
+    ...         Composition, Identity, Constant, Pi, Sine)
+    >>> def values(node):
+    ...     result = []
+    ...     for x in (-1.0, 0.0, 0.5, 2.0):
+    ...         try:
+    ...             result.append(round(node(x), 12))
+    ...         except (ValueError, ZeroDivisionError, OverflowError):
+    ...             result.append(None)
+    ...     return result
+    >>> def compiled(function):
+    ...     return [(round(y, 12) if y == y else None)
+    ...             for y in function.vectorized([-1.0, 0.0, 0.5, 2.0])]
+    >>> trees = [Addition(Pi(), Multiplication(Constant(2), Identity())),
+    ...          Multiplication(Constant(0),
+    ...                         Exponentiation(Identity(), Constant(-1.0))),
+    ...          Exponentiation(Identity(), Constant(0)),
+    ...          Composition(Sine(), Multiplication(Identity(), Identity()))]
+    >>> for tree in trees:
+    ...     print compiled(compile_tree(tree)) == values(tree), values(tree)
+    True [1.14159265359, 3.14159265359, 4.14159265359, 7.14159265359]
+    True [-0.0, None, 0.0, 0.0]
+    True [1.0, 1.0, 1.0, 1.0]
+    True [0.841470984808, 0.0, 0.247403959255, -0.756802495308]
+
+    compile_many gives the same values:
+    >>> [compiled(f) for f in compile_many(trees)] == [values(tree)
+    ...         for tree in trees]
+    True
+    """
+
+    return _compile(simplify(node), vectorized)
+
+
+def _compile(node, vectorized=False):
+    """Returns function for tree at node (already simplified)."""
+
+    values = _Values()
+    steps, equations = values.equations([values.add(node)])
+    return plotter.parse.parse_steps(steps, equations[0], vectorized)
+
+
+def compile_many(nodes):
+    """Returns list of functions for trees, sharing equal subtrees.
+
+    Each function works like one from compile_tree, but when one is
+    evaluated on many points (with vectorized), all are evaluated on
+    them at once, so values the trees have in common are computed once
+    and the others get their results without evaluating again.
+    Raises ValueError if a tree has empty children.
+    """
+
+    key = tuple(node.key() for node in nodes)
+    if key in _shared:
+        return list(_shared[key])
+
+    nodes = [simplify(node) for node in nodes]
+    functions = [_compile(node) for node in nodes]
+
+    # only share if trees have values in common
+    separate = sum(_count(node) for node in nodes)
+    if len(nodes) > 1 and _count(*nodes) < separate:
+        values = _Values()
+        roots = [values.add(node) for node in nodes]
+        steps, equations = values.equations(roots)
+        combined = plotter.parse.parse_steps(steps,
+                "(%s,)" % ", ".join(equations), vectorized=True)
+        group = _SharedGroup(combined, functions)
+        functions = [_SharedFunction(group, i) for i in range(len(nodes))]
+
+    if len(_shared) >= _SHARED_CACHE_SIZE:
+        _shared.clear()
+    _shared[key] = functions
+    return list(functions)
+
+
+def _count(*nodes):
+    """Returns number of distinct values computed by trees."""
+    values = _Values()
+    for node in nodes:
+        values.add(node)
+    return len(values.templates) - 1
+
+
+class _SharedGroup(object):
+    """Evaluates functions from compile_many together."""
+
+    def __init__(self, combined, functions):
+        """Creates group from vectorized function returning tuples."""
+        self.combined = combined
+        self.functions = functions
+
+        # values of all functions (a tuple) by point, shared by threads,
+        #  and the (point, index) of functions that raised an error there
+        self.rows = {}
+        self.failed = set()
+        self.lock = threading.Lock()
+
+
+    def evaluate(self, index, xs, errors=None):
+        """Returns values of function index at xs.
+
+        All functions are evaluated at points none of them has been
+        evaluated at yet, so the others find their values later (even
+        if points come in different calls, like chunks of a Budget).
+        The errors of function index are added to errors[0] (if given).
+        """
+
+        if len(xs) < _SHARED_MINIMUM:
+            return self.functions[index].vectorized(xs, errors)
+
+        self.lock.acquire()
+        try:
+            known = dict((x, self.rows[x]) for x in xs if x in self.rows)
+        finally:
+            self.lock.release()
+
+        missing = [x for x in xs if x not in known]
+        failed = set()
+        if missing:
+            rows = self.combined(missing)
+            for i, row in enumerate(rows):
+                # one equation failed: evaluate them separately
+                if not isinstance(row, tuple):
+                    row = []
+                    for j, function in enumerate(self.functions):
+                        counted = [0]
+                        row.append(function.vectorized([missing[i]],
+                                                       counted)[0])
+                        if counted[0]:
+                            failed.add((missing[i], j))
+                    rows[i] = tuple(row)
+            new = dict(zip(missing, rows))
+            known.update(new)
+
+            self.lock.acquire()
+            try:
+                if len(self.rows) + len(new) > _SHARED_POINTS:
+                    self.rows.clear()
+                    self.failed.clear()
+                self.rows.update(new)
+                self.failed.update(failed)
+            finally:
+                self.lock.release()
+
+        if errors is not None:
+            self.lock.acquire()
+            try:
+                failed.update(self.failed)
+            finally:
+                self.lock.release()
+            errors[0] += len([x for x in xs if (x, index) in failed])
+        return [known[x][index] for x in xs]
+
+
+class _SharedFunction(object):
+    """Function of a _SharedGroup."""
+
+    # (see cairoplot.sampling.evaluate)
+    counts_errors = True
+
+    def __init__(self, group, index):
+        """Creates index'th function of group."""
+        self.group = group
+        self.index = index
+        self.function = group.functions[index]
+
+
+    def __call__(self, x):
+        return self.function(x)
+
+
+    def vectorized(self, xs, errors=None):
+        """Returns list of values at xs (nan where undefined), adding the
+        number of errors to errors[0] (if given)."""
+        return self.group.evaluate(self.index, xs, errors)
@@ -6,6 +6,7 @@ import os.path
 import bisect
 
 from .nodes import Node, NODE_WIDTH, NODE_HEIGHT
+from .compiler import compile_tree
 
 _PAREN_WIDTH = 16
 _BINARY_OPERATOR_WIDTH = 2 * _PAREN_WIDTH + 2 * NODE_WIDTH
@@ -37,6 +38,12 @@ class PuzzleDisplay(gtk.DrawingArea):
         self.rootnode = rootnode
         self._updatenextnode()
 
+        # version is increased whenever the tree changes,
+        # so the model is only rebuilt when needed
+        self.version = 0
+        self._model = None
+        self._modelversion = None
+
         # keep track of all nodes and their positions (for tooltip)
         self._nodes = []
         self._positions = []
@@ -74,14 +81,38 @@ class PuzzleDisplay(gtk.DrawingArea):
 
 
     def get_model(self):
-        """Returns a copy of the rootnode, which should be callable."""
+        """Returns function for the tree.
+
+        Finished trees are compiled into a single function,
+        otherwise this is a copy of the rootnode (which is callable).
+        The model is kept until the tree changes, so getting it again
+        costs nothing.
+        """
+
+        if self._modelversion != self.version:
+            self._model = self._createmodel()
+            self._modelversion = self.version
+        return self._model
+
+
+    def _createmodel(self):
+        """Returns new function for the current tree (see get_model)."""
 
         # TODO: if tree state is invalid, we shouldn't be calling this
         if self.rootnode is None:
             return lambda x: 0
+        if self.nextnode is None:
+            return compile_tree(self.rootnode)
         return copy.deepcopy(self.rootnode)
 
 
+    def get_tree(self):
+        """Returns rootnode if the tree is finished, otherwise None."""
+        if self.nextnode is None:
+            return self.rootnode
+        return None
+
+
     def draw(self, context):
         """Draws the current tree (with next node highlighted).
 
@@ -213,6 +244,7 @@ class PuzzleDisplay(gtk.DrawingArea):
             self.set_size_request(self.width, self.height)
 
         # refresh the view, since the tree has changed
+        self.version += 1
         self._updatenextnode()
         self.queue_draw()
 
@@ -254,6 +286,7 @@ class PuzzleDisplay(gtk.DrawingArea):
             self.set_size_request(self.width, self.height)
 
         # refresh the view, since the tree has changed
+        self.version += 1
         self._updatenextnode()
         self.queue_draw()
         return removednode
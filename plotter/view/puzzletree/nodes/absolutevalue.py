@@ -17,7 +17,3 @@ class AbsoluteValue(SimpleNode):
         return abs(x)
 
 
-    def get_equation_string(self, variable):
-        """Returns abs(x) given variable, x."""
-        return "abs(%s)" % variable
-
@@ -8,7 +8,6 @@ class Addition(_BinaryOperator):
 
     CLASS = "addition"
     background = _BinaryOperator.loadbackground("addition.svg")
-    operatorstring = "+"
     title = _("Addition")
     description = _("Combines two objects together into a larger collection."
         " For example, x + x = 2x.")
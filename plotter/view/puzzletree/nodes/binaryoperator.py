@@ -22,9 +22,5 @@ class BinaryOperator(_Node):
 
     def get_equation_string(self, variable):
         """Returns a string representing the current equation."""
-
-        return "(%s %s %s)" % (
-            _Node.get_equation_string(self.children[0], variable),
-            self.operatorstring,
-            _Node.get_equation_string(self.children[1], variable))
+        return self.build_equation_string(variable)
 
@@ -1,6 +1,5 @@
 # coding=utf-8
 
-from .node import Node
 from .binaryoperator import BinaryOperator
 from gettext import gettext as _
 
@@ -19,11 +18,3 @@ class Composition(BinaryOperator):
         """Returns self's leftchild(rightchild(x))."""
         return self.children[0](self.children[1](x))
 
-
-    def get_equation_string(self, variable):
-        """Returns a string representing the current equation."""
-
-        # result from right will be new variable in left
-        variable = Node.get_equation_string(self.children[1], variable)
-        return Node.get_equation_string(self.children[0], variable)
-
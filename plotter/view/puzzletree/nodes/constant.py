@@ -61,7 +61,12 @@ class Constant(_Node):
         return headersettings
 
 
+    def key(self):
+        """Returns key including value (see Node.key)."""
+        return (self.CLASS, self.value)
+
+
     def get_equation_string(self, variable):
         """Returns string form of value (ignoring variable)."""
-        return str(self.value)
+        return self.build_equation_string(variable, self.value)
 
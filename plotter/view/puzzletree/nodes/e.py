@@ -21,7 +21,3 @@ class E(SimpleNode):
         return math.e
 
 
-    def get_equation_string(self, variable):
-        """Returns e, ignoring the variable."""
-        return "e"
-
@@ -8,7 +8,6 @@ class Exponentiation(_BinaryOperator):
 
     CLASS = "exponentiation"
     background = _BinaryOperator.loadbackground("exponentiation.svg")
-    operatorstring = "**"
     title = _("Exponentiation")
     description = _(u"Combines two objects by multiplying the left one "
         u"for the right number of times.\n"
@@ -17,7 +17,3 @@ class Identity(SimpleNode):
         return x
 
 
-    def get_equation_string(self, variable):
-        """Returns variable, since this is the identity function."""
-        return variable
-
@@ -8,7 +8,6 @@ class Multiplication(_BinaryOperator):
 
     CLASS = "multiplication"
     background = _BinaryOperator.loadbackground("multiplication.svg")
-    operatorstring = "*"
     title = _("Multiplication")
     description = _(u"Combines two objects by adding the left one "
         u"for the right number of times.\n"
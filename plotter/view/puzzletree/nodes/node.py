@@ -3,6 +3,8 @@
 import gtk.gdk
 import os.path
 
+import plotter.nodestrings
+
 _FILE_VERSION = 1
 NODE_WIDTH = 32
 NODE_HEIGHT = 32
@@ -55,6 +57,29 @@ class Node(object):
         return settings
 
 
+    def key(self):
+        """Returns hashable value that is equal for trees of equal structure.
+
+        Sub-classes with parameters include them (like value in Constant).
+        """
+        return (self.CLASS, tuple(None if c is None else c.key()
+                for c in self.children))
+
+
+    def __eq__(self, other):
+        """Trees are equal if they have the same structure (see key)."""
+        return isinstance(other, Node) and self.key() == other.key()
+
+
+    def __ne__(self, other):
+        return not self == other
+
+
+    def __hash__(self):
+        """Hashes structure, so don't change trees used as dictionary keys."""
+        return hash(self.key())
+
+
     @staticmethod
     def loadbackground(filename):
         """Loads an image from the puzzle piece folder."""
@@ -71,6 +96,19 @@ class Node(object):
         return node.get_equation_string(variable)
 
 
+    def build_equation_string(self, variable, value=None):
+        """Returns equation string of this node and its children.
+
+        Strings come from plotter.nodestrings, which also turns saved
+        nodes into equations without gtk; value is a constant's value.
+        """
+
+        def child(index, variable):
+            return Node.get_equation_string(self.children[index], variable)
+        return plotter.nodestrings.equation_string(self.CLASS, child,
+                variable, value)
+
+
     def draw(self, context):
         """Draws puzzle piece at current location on context."""
 
@@ -21,7 +21,3 @@ class Pi(SimpleNode):
         return math.pi
 
 
-    def get_equation_string(self, variable):
-        """Returns pi, ignoring the variable."""
-        return "pi"
-
@@ -10,3 +10,8 @@ class SimpleNode(_Node):
         """Ignore settings, since no parameters for SimpleNode."""
         return nodeclass()
 
+
+    def get_equation_string(self, variable):
+        """Returns a string representing the current equation."""
+        return self.build_equation_string(variable)
+
@@ -20,7 +20,3 @@ class Sine(SimpleNode):
         return math.sin(x)
 
 
-    def get_equation_string(self, variable):
-        """Returns sin(x) given x."""
-        return "sin(%s)" % variable
-
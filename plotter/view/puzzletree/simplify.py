@@ -0,0 +1,212 @@
+"""Algebraic simplification of puzzle trees.
+
+Simplified trees compute the same values with fewer nodes: parts that
+don't depend on x are folded into constants, and operations that do
+nothing (like x + 0, x ** 1 or composing with the identity) are removed.
+"""
+
+import copy
+
+from .nodes import (Addition, Multiplication, Exponentiation, Composition,
+        Identity, Constant, Pi, E, Sine, AbsoluteValue)
+
+# placeholder for the variable when getting a node's equation string
+_VARIABLE = "\0"
+
+# nodes that never fail to evaluate, whatever their input (even an
+# infinite or nan one), so their results can be dropped (f ** 0 is 1
+# only if f can't be undefined)
+_TOTAL = (Addition, Multiplication, Composition, Identity, Constant, Pi, E,
+        AbsoluteValue)
+
+# nodes that are defined and finite wherever x is (if their children
+# are too), like sin(x) but not x * x, which can overflow (0 * f is 0
+# only if f is finite, since 0 * inf is nan)
+_FINITE = (Composition, Identity, Constant, Pi, E, Sine, AbsoluteValue)
+
+# math errors that mean a value is undefined (same as plotter.parse)
+_EVALUATION_ERRORS = (ValueError, ZeroDivisionError, OverflowError)
+
+
+def simplify(node):
+    """Returns simplified copy of the tree at node (node isn't changed).
+
+    Empty children (None) are kept, so unfinished trees can be simplified.
+
+    Usage:
+    >>> print simplify(Addition(Pi(), E())).get_equation_string("x")
+    5.859874482048838
+    >>> print simplify(Exponentiation(Identity(), Constant(1))
+    ...         ).get_equation_string("x")
+    x
+
+    Simplified trees have the same values, and are undefined at the same
+    points (0 * x ** -1 isn't folded, since x ** -1 is undefined at 0,
+    and neither is 0 * (x * x), which is nan where x * x overflows):
+    >>> def values(node):
+    ...     result = []
+    ...     for x in (-1.0, 0.0, 0.5, 2.0):
+    ...         try:
+    ...             result.append(round(node(x), 12))
+    ...         except _EVALUATION_ERRORS:
+    ...             result.append(None)
+    ...     return result
+    >>> trees = [Addition(Pi(), E()),
+    ...          Multiplication(Constant(0), AbsoluteValue()),
+    ...          Multiplication(Constant(0),
+    ...                         Exponentiation(Identity(), Constant(-1.0))),
+    ...          Exponentiation(Identity(), Constant(0)),
+    ...          Composition(Sine(), Addition(Identity(), Constant(0))),
+    ...          Multiplication(Constant(0), Composition(Sine(), Identity())),
+    ...          Multiplication(Constant(0),
+    ...                         Multiplication(Identity(), Identity()))]
+    >>> for tree in trees:
+    ...     simplified = simplify(tree)
+    ...     print values(tree) == values(simplified),
+    ...     print simplified.get_equation_string("x"), values(tree)
+    True 5.859874482048838 [5.859874482049, 5.859874482049, 5.859874482049, 5.859874482049]
+    True 0 [0.0, 0.0, 0.0, 0.0]
+    True (0 * (x ** (-1.0))) [-0.0, None, 0.0, 0.0]
+    True 1 [1.0, 1.0, 1.0, 1.0]
+    True sin(x) [-0.841470984808, 0.0, 0.479425538604, 0.909297426826]
+    True 0 [-0.0, 0.0, 0.0, 0.0]
+    True (0 * (x * x)) [0.0, 0.0, 0.0, 0.0]
+    >>> tree = Multiplication(Constant(0), Multiplication(Identity(), Identity()))
+    >>> tree(1e200), simplify(tree)(1e200)
+    (nan, nan)
+    >>> tree = Composition(Sine(), Multiplication(Identity(), Identity()))
+    >>> simplify(Exponentiation(tree, Constant(0))).get_equation_string("x")
+    '(sin((x * x)) ** 0)'
+    """
+
+    if node is None:
+        return None
+
+    children = [simplify(c) for c in node.children]
+    simplified = copy.copy(node)
+    simplified.children = children
+
+    if not _usesvariable(simplified):
+        return _fold(simplified)
+
+    if isinstance(node, Composition):
+        left, right = children
+        if isinstance(right, Identity):
+            return left
+        if isinstance(left, Identity):
+            return right
+
+    elif isinstance(node, Addition):
+        left, right = children
+        if _isvalue(left, 0):
+            return right
+        if _isvalue(right, 0):
+            return left
+
+    elif isinstance(node, Multiplication):
+        left, right = children
+        if _isvalue(left, 1):
+            return right
+        if _isvalue(right, 1):
+            return left
+        if ((_isvalue(left, 0) and _isfinite(right)) or
+            (_isvalue(right, 0) and _isfinite(left))):
+            return Constant(0)
+
+    elif isinstance(node, Exponentiation):
+        left, right = children
+        if _isvalue(right, 1):
+            return left
+        if ((_isvalue(right, 0) and _istotal(left)) or
+            (_isvalue(left, 1) and _istotal(right))):
+            return Constant(1)
+
+    return simplified
+
+
+def _fold(node):
+    """Returns Constant with value of node (which doesn't use x).
+
+    If the value is undefined or infinite, node is returned instead.
+    """
+
+    if isinstance(node, Constant):
+        return node
+    try:
+        value = node(0.0)
+    except _EVALUATION_ERRORS:
+        return node
+    if value != value or value in (float("inf"), float("-inf")):
+        return node
+    return Constant(value)
+
+
+def _usesvariable(node):
+    """Returns whether node's value depends on its variable.
+
+    This includes where it is undefined, and trees with empty children
+    are assumed to, so they aren't folded.
+    """
+
+    if node is None:
+        return True
+    if isinstance(node, Composition):
+        left, right = node.children
+        return _usesvariable(right) and (_usesvariable(left) or
+                not _istotal(right))
+    if node.children:
+        for child in node.children:
+            if _usesvariable(child):
+                return True
+        return False
+    return _VARIABLE in node.get_equation_string(_VARIABLE)
+
+
+def _istotal(node):
+    """Returns whether node is defined wherever x is (x is finite)."""
+
+    if node is None:
+        return False
+    if _isfinite(node):
+        return True
+    if isinstance(node, Composition):
+        left, right = node.children
+        return _istotal(right) and (_acceptsall(left) or
+                (_isfinite(right) and _istotal(left)))
+    if not isinstance(node, _TOTAL):
+        return False
+    for child in node.children:
+        if not _istotal(child):
+            return False
+    return True
+
+
+def _acceptsall(node):
+    """Returns whether node is defined for any input (see _TOTAL)."""
+
+    if node is None or not isinstance(node, _TOTAL):
+        return False
+    for child in node.children:
+        if not _acceptsall(child):
+            return False
+    return True
+
+
+def _isfinite(node):
+    """Returns whether node is defined and finite wherever x is (see
+    _FINITE)."""
+
+    if node is None or not isinstance(node, _FINITE):
+        return False
+    if isinstance(node, Constant):
+        value = node.value
+        return value == value and value not in (float("inf"), float("-inf"))
+    for child in node.children:
+        if not _isfinite(child):
+            return False
+    return True
+
+
+def _isvalue(node, value):
+    """Returns whether node is a constant equal to value."""
+    return isinstance(node, Constant) and node.value == value
@@ -4,6 +4,7 @@ from sugar.activity import bundlebuilder
 # ignore directories not needed for activity
 bundlebuilder.IGNORE_DIRS.append(".bzr")
 bundlebuilder.IGNORE_DIRS.append("thirdparty")
+bundlebuilder.IGNORE_DIRS.append("benchmarks")
 
 # ignore files (vi *.swp, bzr, and inkscape icons)
 bundlebuilder.IGNORE_FILES.append(".bzrignore")